@@ -0,0 +1 @@
+"""PureDoc benchmark suite (run with ``python -m benchmarks.run``)"""
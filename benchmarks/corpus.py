@@ -0,0 +1,100 @@
+"""Synthetic LLM-style Markdown corpus
+
+生成与大模型回答相似的 Markdown：多级标题、强调密集的段落、嵌套的有序/无序列表、
+行内代码。输出完全由 seed 决定，同一 seed 和大小在不同机器、不同版本间得到相同文本，
+保证基准结果可比。
+"""
+
+import random
+
+# 预设的语料大小
+SIZES = {
+    "1KB": 1 << 10,
+    "100KB": 100 << 10,
+    "1MB": 1 << 20,
+    "10MB": 10 << 20,
+    "100MB": 100 << 20,
+}
+
+_WORDS = (
+    "model token context latency throughput cache request response layer vector "
+    "embedding prompt output input memory buffer stream batch worker queue "
+    "template document paragraph heading list style format render parse export "
+    "模型 上下文 推理 缓存 文档 段落 标题 列表 样式 格式 渲染 解析 导出"
+).split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _sentence(rng: random.Random) -> str:
+    """A sentence with the emphasis density typical of LLM answers"""
+    parts = []
+    for _ in range(rng.randint(3, 6)):
+        r = rng.random()
+        text = _words(rng, rng.randint(1, 4))
+        if r < 0.2:
+            parts.append(f"**{text}**")
+        elif r < 0.3:
+            parts.append(f"*{text}*")
+        elif r < 0.38:
+            parts.append(f"`{rng.choice(_WORDS)}()`")
+        elif r < 0.42:
+            parts.append(f"***{text}***")
+        else:
+            parts.append(text)
+    return " ".join(parts).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    lines = [" ".join(_sentence(rng) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 3))]
+    return "\n".join(lines)
+
+
+def _list(rng: random.Random, depth: int = 0) -> list[str]:
+    """A (possibly nested) bullet or ordered list"""
+    ordered = rng.random() < 0.5
+    indent = "   " * depth
+    lines = []
+    for i in range(1, rng.randint(2, 6)):
+        marker = f"{i}." if ordered else "-"
+        lines.append(f"{indent}{marker} {_sentence(rng)}")
+        if depth < 2 and rng.random() < 0.25:
+            lines.extend(_list(rng, depth + 1))
+    return lines
+
+
+def _section(rng: random.Random, index: int) -> str:
+    blocks = [f"## {index}. {_words(rng, rng.randint(2, 5)).title()}"]
+    for _ in range(rng.randint(2, 5)):
+        r = rng.random()
+        if r < 0.5:
+            blocks.append(_paragraph(rng))
+        elif r < 0.85:
+            blocks.append("\n".join(_list(rng)))
+        else:
+            blocks.append(f"### {_words(rng, rng.randint(2, 4)).title()}")
+    return "\n\n".join(blocks)
+
+
+def generate(size: int, seed: int = 0) -> str:
+    """Generate a Markdown document of at least ``size`` characters
+
+    Args:
+        size: Target size in characters
+        seed: Random seed
+
+    Returns:
+        Markdown text
+    """
+    rng = random.Random(seed)
+    parts = [f"# {_words(rng, 4).title()}", _paragraph(rng)]
+    total = sum(len(p) + 2 for p in parts)
+    index = 1
+    while total < size:
+        section = _section(rng, index)
+        parts.append(section)
+        total += len(section) + 2
+        index += 1
+    return "\n\n".join(parts) + "\n"
@@ -0,0 +1,251 @@
+"""Conversion benchmark suite
+
+Usage::
+
+    python -m benchmarks.run                          # 1KB..10MB, write benchmarks/results/<time>.json
+    python -m benchmarks.run --sizes 1MB 100MB -o new.json
+    python -m benchmarks.run --compare old.json new.json
+
+每个用例分别计时 markdown-it 解析、中间模型构建、文本预览渲染、Word 渲染和保存，
+并记录输出大小。峰值内存在单独的子进程中跑一轮整个流程，取该进程的峰值常驻内存
+(RSS)：lxml/libxml2 的 XML 树由 C 分配，tracemalloc 统计不到。结果为 JSON，
+可以用 --compare 对比两次运行，超过阈值的变慢会被标出 (退出码 1)。
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    # Windows 没有 resource 模块，跳过峰值内存
+    resource = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.corpus import SIZES, generate  # noqa: E402
+from src import __version__  # noqa: E402
+from src.core import DocumentModel, OoxmlWriter, PureConverter  # noqa: E402
+from src.core.text_renderer import TextRenderer  # noqa: E402
+from src.core.word_renderer import WordRenderer  # noqa: E402
+
+DEFAULT_SIZES = ("1KB", "100KB", "1MB", "10MB")
+ENGINES = ("docx", "ooxml")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SETTINGS = {"ignore_bullets": False, "ordered_list_style": "text"}
+# 对比时低于该差值 (秒) 的计时变化视为噪声
+NOISE_FLOOR = 1e-3
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_pipeline(converter: PureConverter, md_text: str, engine: str) -> tuple[dict, int]:
+    """Run one conversion, timing each stage
+
+    Returns:
+        Tuple of (stage -> seconds, .docx size in bytes)
+    """
+    stages = {}
+    tokens, stages["parse"] = _timed(converter.md.parse, md_text)
+    model, stages["model"] = _timed(DocumentModel.from_tokens, tokens)
+    _, stages["render_text"] = _timed(lambda: "\n".join(TextRenderer(SETTINGS).render_lines(model.blocks)))
+
+    out = io.BytesIO()
+    if engine == "ooxml":
+        package, stages["template"] = _timed(converter.template_cache.get_package, converter.template_path)
+        writer = OoxmlWriter(package, out, SETTINGS)
+        _, stages["render_word"] = _timed(writer.write, model.blocks)
+        _, stages["save"] = _timed(writer.close)
+    else:
+        doc, stages["template"] = _timed(converter.template_cache.get, converter.template_path)
+        renderer = WordRenderer(doc, SETTINGS, converter.get_style_index())
+        _, stages["render_word"] = _timed(renderer.render, model.blocks)
+        _, stages["save"] = _timed(doc.save, out)
+    return stages, out.tell()
+
+
+def peak_rss(name: str, engine: str, template: str | None, seed: int) -> int | None:
+    """Peak resident set size (bytes) of one conversion, run in a fresh process
+
+    Returns:
+        Bytes, or None where the resource module is unavailable
+    """
+    if resource is None:
+        return None
+    cmd = [sys.executable, "-m", "benchmarks.run", "--rss-case", name, engine, "--seed", str(seed)]
+    if template:
+        cmd += ["-t", template]
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return int(proc.stdout.split()[-1])
+
+
+def _rss_case(name: str, engine: str, template: str | None, seed: int) -> int:
+    """Run one conversion in this process and return its peak RSS in bytes (see peak_rss)"""
+    converter = PureConverter(template_path=template)
+    run_pipeline(converter, generate(SIZES[name], seed), engine)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KiB 为单位，macOS 以字节为单位
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def bench_case(
+    converter: PureConverter, name: str, md_text: str, engine: str, repeat: int, memory: bool, seed: int = 0
+) -> dict:
+    """Benchmark one (size, engine) case; stage timings are the best of ``repeat`` runs"""
+    best: dict[str, float] = {}
+    output_bytes = 0
+    for _ in range(repeat):
+        stages, output_bytes = run_pipeline(converter, md_text, engine)
+        for stage, seconds in stages.items():
+            best[stage] = min(seconds, best.get(stage, seconds))
+
+    result = {
+        "case": name,
+        "engine": engine,
+        "input_chars": len(md_text),
+        "output_bytes": output_bytes,
+        "repeat": repeat,
+        "stages": {stage: round(seconds, 6) for stage, seconds in best.items()},
+        "total": round(sum(best.values()), 6),
+    }
+    if memory:
+        # 新进程中单独跑一轮，峰值不受前面用例影响
+        rss = peak_rss(name, engine, converter.template_path, seed)
+        if rss is not None:
+            result["peak_rss"] = rss
+    return result
+
+
+def run(sizes: list[str], engines: list[str], template: str | None, repeat: int | None, memory: bool, seed: int) -> dict:
+    """Run the whole suite and return the JSON-serializable results"""
+    converter = PureConverter(template_path=template)
+    # 预热解析器和模板缓存
+    run_pipeline(converter, generate(SIZES["1KB"], seed), engines[0])
+
+    cases = []
+    for name in sizes:
+        md_text = generate(SIZES[name], seed)
+        for engine in engines:
+            # 大文档只跑一轮
+            n = repeat if repeat else (3 if len(md_text) <= SIZES["1MB"] else 1)
+            result = bench_case(converter, name, md_text, engine, n, memory, seed)
+            cases.append(result)
+            print(
+                f"{name:>6} {engine:<6} total {result['total']:9.3f}s  "
+                + "  ".join(f"{k} {v:.3f}" for k, v in result["stages"].items())
+                + (f"  peak RSS {result['peak_rss'] / 2**20:.1f}MiB" if "peak_rss" in result else ""),
+                flush=True,
+            )
+        del md_text
+
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "template": template,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "cases": cases,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print per-case ratios between two result files
+
+    Returns:
+        Number of metrics that regressed by more than ``threshold``
+    """
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {(c["case"], c["engine"]): c for c in json.load(f)["cases"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["cases"]
+
+    regressions = 0
+    for case in new:
+        base = old.get((case["case"], case["engine"]))
+        if base is None:
+            continue
+        # (指标, 旧值, 新值, 是否为计时)
+        metrics = [(f"stages.{k}", base["stages"].get(k), v, True) for k, v in case["stages"].items()]
+        metrics.append(("total", base["total"], case["total"], True))
+        for key in ("peak_rss", "output_bytes"):
+            if key in case and key in base:
+                metrics.append((key, base[key], case[key], False))
+
+        print(f"== {case['case']} / {case['engine']}")
+        for metric, before, after, timing in metrics:
+            if not before:
+                continue
+            ratio = after / before
+            flag = ""
+            if timing and abs(after - before) < NOISE_FLOOR:
+                pass
+            elif ratio > 1 + threshold:
+                flag = "  ⚠️  regression"
+                regressions += 1
+            elif ratio < 1 - threshold:
+                flag = "  ✅ improved"
+            print(f"   {metric:<20} {before:>14.6g} -> {after:<14.6g} x{ratio:.2f}{flag}")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="PureDoc conversion benchmarks")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES), help="语料大小")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES), help="Word 后端")
+    parser.add_argument("-t", "--template", help="Word 模板 (.docx)，默认使用内置模板")
+    parser.add_argument("-r", "--repeat", type=int, help="每个用例的重复次数 (默认: ≤1MB 3 次，否则 1 次)")
+    parser.add_argument("--no-memory", action="store_true", help="跳过峰值内存 (子进程 RSS) 统计")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("-o", "--output", help="结果 JSON 路径 (默认 benchmarks/results/<时间>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="对比两次运行的结果并退出")
+    parser.add_argument("--threshold", type=float, default=0.10, help="对比时判定变慢的相对阈值")
+    # 内部使用：在子进程中测量单个用例的峰值 RSS
+    parser.add_argument("--rss-case", nargs=2, metavar=("SIZE", "ENGINE"), help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(args.compare[0], args.compare[1], args.threshold) else 0
+
+    if args.rss_case:
+        print(_rss_case(args.rss_case[0], args.rss_case[1], args.template, args.seed))
+        return 0
+
+    template = args.template
+    if template is None:
+        bundled = PROJECT_ROOT / "assets" / "template" / "template.docx"
+        template = str(bundled) if bundled.exists() else None
+
+    results = run(args.sizes, args.engines, template, args.repeat, not args.no_memory, args.seed)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,34 @@
 
 A lightweight cross-platform tool for converting Markdown documents
 to clean, perfectly formatted Microsoft Word files.
+
+Run without arguments to start the desktop app, or use a CLI sub-command::
+
+    python main.py convert <inputs...> -o <output_dir> [--jobs N]
+
+``python main.py --startup-timing [file.md]`` reports time to first window and first preview.
 """
 
-import flet as ft
+import time
+
+# 启动计时起点 (见 --startup-timing)
+_STARTED = time.perf_counter()
+
+import sys
+from typing import TYPE_CHECKING
 
-from src.ui.theme import Theme
-from src.ui.main_page import MainPage
 from src import __version__
+from src.cli import CLI_COMMANDS
+from src.utils.startup import WINDOW, parse_startup_args, startup_timer
 
-def main(page: ft.Page):
+if TYPE_CHECKING:
+    import flet as ft
+
+def main(page: "ft.Page"):
     """Main application entry point"""
+    from src.ui.theme import Theme
+    from src.ui.main_page import MainPage
+
     page.title = "PureDoc - Markdown to Word - (v" + __version__ + ")"  
     # page.padding = 20
     page.window.min_width = 800
@@ -19,6 +37,7 @@ def main(page: ft.Page):
     page.window.min_height = 600
     Theme.apply_to_page(page)
     main_page = MainPage(page)
+    startup_timer.mark(WINDOW)
 
 
     def on_close(event):
@@ -27,7 +46,16 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    timing, sample_path = parse_startup_args(sys.argv[1:])
+    if timing:
+        startup_timer.start(_STARTED, sample_path)
+
     try:
+        import flet as ft
         ft.run(main, assets_dir='assets')
     except Exception as e:
         print(f"启动失败: {e}")
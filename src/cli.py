@@ -0,0 +1,259 @@
+"""Command line interface for PureDoc
+
+Headless entry point, e.g.::
+
+    python main.py convert docs/ "reports/**/*.md" -o out/ --jobs 8
+    python main.py serve --port 8765 --template-dir templates/
+
+This module must not import flet so that batch conversion works without a GUI.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+
+# Sub-commands handled by the CLI instead of the desktop app
+CLI_COMMANDS = ("convert", "serve")
+
+
+def _glob_base(pattern: str) -> Path:
+    """Get the static directory prefix of a glob pattern (before the first wildcard)"""
+    parts = Path(pattern).parts
+    base_parts = []
+    for part in parts:
+        if glob.has_magic(part):
+            break
+        base_parts.append(part)
+    return Path(*base_parts) if base_parts else Path(".")
+
+
+def collect_inputs(inputs: list[str]) -> list[tuple[Path, Path]]:
+    """Expand files, globs and directories into (source, relative output path) pairs
+
+    Args:
+        inputs: Files, glob patterns or directories
+
+    Returns:
+        List of (source file, path relative to the output directory) pairs
+    """
+    pairs: list[tuple[Path, Path]] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            sources = sorted(p for p in path.rglob("*") if p.suffix.lower() in MARKDOWN_EXTENSIONS)
+            pairs.extend((src, src.relative_to(path)) for src in sources)
+        elif glob.has_magic(item):
+            base = _glob_base(item)
+            sources = sorted(Path(p) for p in glob.glob(item, recursive=True))
+            pairs.extend(
+                (src, src.relative_to(base))
+                for src in sources
+                if src.is_file() and src.suffix.lower() in MARKDOWN_EXTENSIONS
+            )
+        elif path.is_file():
+            pairs.append((path, Path(path.name)))
+        else:
+            print(f"⚠️  跳过不存在的输入: {item}", file=sys.stderr)
+    return pairs
+
+
+def plan_outputs(pairs: list[tuple[Path, Path]], output_dir: Path) -> dict[str, str]:
+    """Assign each source file a distinct output path
+
+    A source listed more than once is converted once. Sources that would write the same
+    output (``a.md`` and ``a.markdown``, or equal names from different directories given
+    as loose files) keep the first output path in input order; later ones get a numbered
+    name (``a-2.docx``) and a warning is printed.
+
+    Args:
+        pairs: (source file, path relative to the output directory) pairs from collect_inputs
+        output_dir: Output directory
+
+    Returns:
+        Dict of source path -> output path, in input order
+    """
+    targets: dict[str, str] = {}
+    seen_sources: set[str] = set()
+    # 输出路径 -> 源文件；按小写比较，大小写不敏感的文件系统上同样不会冲突
+    owners: dict[str, str] = {}
+    for src, rel in pairs:
+        key = os.path.normcase(os.path.abspath(src))
+        if key in seen_sources:
+            continue
+        seen_sources.add(key)
+
+        dst = output_dir / rel.with_suffix(".docx")
+        candidate, n = dst, 1
+        while str(candidate).lower() in owners:
+            n += 1
+            candidate = dst.with_name(f"{dst.stem}-{n}{dst.suffix}")
+        if candidate != dst:
+            print(f"⚠️  {src} 与 {owners[str(dst).lower()]} 的输出路径相同，改为输出到 {candidate}", file=sys.stderr)
+        owners[str(candidate).lower()] = str(src)
+        targets[str(src)] = str(candidate)
+    return targets
+
+
+def _default_template() -> str | None:
+    """Get the bundled template path, if present"""
+    from src.utils.get_path import get_resource_path
+
+    template = get_resource_path("template/template.docx")
+    return template if os.path.exists(template) else None
+
+
+def _format_stats(stats: dict) -> str:
+    """Format a ConversionStats snapshot as a single line"""
+    timings = "  ".join(f"{k} {v * 1000:.1f}ms" for k, v in stats["timings"].items())
+    counters = "  ".join(f"{k} {v}" for k, v in stats["counters"].items())
+    return f"{timings}  |  {counters}"
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    """Run the `convert` sub-command
+
+    Returns:
+        Process exit code
+    """
+    from src.core import worker
+
+    pairs = collect_inputs(args.inputs)
+    if not pairs:
+        print("❌ 未找到 Markdown 文件", file=sys.stderr)
+        return 1
+
+    targets = plan_outputs(pairs, Path(args.output_dir))
+
+    template = args.template if args.template is not None else _default_template()
+    settings = {
+        "ignore_bullets": args.ignore_bullets,
+        "ordered_list_style": args.ordered_list_style,
+        "code_highlight": args.code_highlight,
+        "character_styles": args.character_styles,
+    }
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(targets)))
+
+    failed = 0
+    total = len(targets)
+
+    def report(index: int, src: str, error: str | None, elapsed: float, stats: dict | None) -> None:
+        nonlocal failed
+        if error:
+            failed += 1
+            print(f"❌ [{index}/{total}] {src}: {error}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"✅ [{index}/{total}] {src} -> {targets[src]} ({elapsed:.2f}s)")
+            if stats:
+                print("   " + _format_stats(stats))
+
+    if jobs == 1:
+        # 文件数少于可用进程数时 (例如单个超大文件)，把空闲的核用于并行解析
+        worker.init_worker(template, args.stats, parse_workers=args.jobs or os.cpu_count() or 1)
+        for index, (src, dst) in enumerate(targets.items(), 1):
+            report(index, *worker.convert_file(src, dst, settings, args.engine))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=worker.init_worker,
+            initargs=(template, args.stats),
+        ) as pool:
+            futures = [
+                pool.submit(worker.convert_file, src, dst, settings, args.engine)
+                for src, dst in targets.items()
+            ]
+            for index, future in enumerate(as_completed(futures), 1):
+                report(index, *future.result())
+
+    if not args.quiet:
+        print(f"完成: {total - failed}/{total} 个文件转换成功")
+    return 1 if failed else 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """Run the `serve` sub-command
+
+    Returns:
+        Process exit code
+    """
+    from src.server import discover_templates, run_server
+
+    template = args.template if args.template is not None else _default_template()
+    templates = discover_templates(args.template_dir, template)
+    return run_server(args.host, args.port, templates, workers=args.jobs or None, max_queue=args.max_queue)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(prog="puredoc", description="PureDoc - Markdown to Word")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser("convert", help="批量将 Markdown 转换为 Word (.docx)")
+    convert.add_argument("inputs", nargs="+", help="Markdown 文件、glob 模式或目录")
+    convert.add_argument("-o", "--output-dir", required=True, help="输出目录 (保持输入的目录结构)")
+    convert.add_argument("-t", "--template", default=None, help="Word 模板路径 (.docx)，默认使用内置模板")
+    convert.add_argument("-j", "--jobs", type=int, default=0, help="并行进程数，默认等于 CPU 核数；只有一个文件时用于并行解析超大文件")
+    convert.add_argument(
+        "--ignore-bullets",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="忽略无序列表符号 (•)",
+    )
+    convert.add_argument(
+        "--ordered-list-style",
+        choices=["text", "list", "none"],
+        default="text",
+        help="有序列表处理方式: 转为纯文本 / Word 自动列表 / 忽略数字",
+    )
+    convert.add_argument(
+        "--code-highlight",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="代码块语法着色 (需要安装 pygments)",
+    )
+    convert.add_argument(
+        "--character-styles",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="加粗、斜体、行内代码使用字符样式 (Strong / Emphasis / Inline Code，模板缺少时自动创建)，文档更小",
+    )
+    convert.add_argument(
+        "--engine",
+        choices=["docx", "ooxml"],
+        default="docx",
+        help="Word 写出方式: python-docx (参考实现) / 直接写出 OOXML (更快)",
+    )
+    convert.add_argument("--stats", action="store_true", help="输出每个文件各阶段的耗时与计数")
+    convert.add_argument("-q", "--quiet", action="store_true", help="只输出错误信息")
+    convert.set_defaults(func=run_convert)
+
+    serve = subparsers.add_parser("serve", help="启动本地 HTTP 转换服务")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址 (默认仅本机)")
+    serve.add_argument("-p", "--port", type=int, default=8765, help="监听端口")
+    serve.add_argument("-t", "--template", default=None, help="默认 Word 模板 (.docx)，默认使用内置模板")
+    serve.add_argument("--template-dir", default=None, help="模板目录，其中每个 .docx 以文件名 (不含扩展名) 作为模板 ID")
+    serve.add_argument("-j", "--jobs", type=int, default=0, help="工作进程数，默认等于 CPU 核数")
+    serve.add_argument("--max-queue", type=int, default=256, help="排队请求上限，超出时返回 503")
+    serve.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """CLI entry point
+
+    Args:
+        argv: Command line arguments (without program name)
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
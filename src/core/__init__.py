@@ -1,5 +1,39 @@
-"""Core conversion logic module"""
+"""Core conversion logic module
 
-from.pure_converter import PureConverter
+导出的类按需导入 (PEP 562)：只用到预览或缓存时不会加载 python-docx / lxml。
+"""
 
-__all__ = ["PureConverter"]
+import importlib
+
+# 导出名 -> 所在子模块
+_EXPORTS = {
+    "PureConverter": "pure_converter",
+    "ConversionCancelled": "pure_converter",
+    "TemplateCache": "template_cache",
+    "StyleIndex": "style_index",
+    "IncrementalPreview": "incremental_preview",
+    "DocumentModel": "document_model",
+    "Block": "document_model",
+    "Cell": "document_model",
+    "ImageRun": "document_model",
+    "Run": "document_model",
+    "OoxmlWriter": "ooxml_writer",
+    "ResultCache": "result_cache",
+    "ConversionStats": "stats",
+    "NULL_STATS": "stats",
+}
+
+__all__ = ["PureConverter", "ConversionCancelled", "TemplateCache", "StyleIndex", "IncrementalPreview", "DocumentModel", "Block", "Cell", "ImageRun", "Run", "OoxmlWriter", "ResultCache", "ConversionStats", "NULL_STATS"]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
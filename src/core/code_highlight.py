@@ -0,0 +1,87 @@
+"""Optional syntax highlighting for code blocks
+
+安装了 pygments 时按语言给代码块着色，否则退化为纯等宽文本。词法分析代价较高，
+而大文档里常有重复的代码片段，预览/导出又会反复渲染同一个代码块，所以结果按
+(代码, 语言) 缓存。
+"""
+
+from functools import lru_cache
+
+from .document_model import BOLD, ITALIC
+
+try:
+    from pygments import lex
+    from pygments.lexers import get_lexer_by_name
+    from pygments.styles import get_style_by_name
+    from pygments.util import ClassNotFound
+except ImportError:
+    lex = None
+
+HIGHLIGHT_AVAILABLE = lex is not None
+
+# pygments 配色方案
+HIGHLIGHT_STYLE = "default"
+
+# 一行代码: ((文本, 颜色 "RRGGBB" 或 None, BOLD/ITALIC 标志), ...)
+Line = tuple[tuple[str, str | None, int], ...]
+
+
+@lru_cache(maxsize=64)
+def _lexer(lang: str):
+    """Get (and cache) the lexer for a fence language, or None if unknown"""
+    try:
+        return get_lexer_by_name(lang, stripnl=False, ensurenl=False)
+    except ClassNotFound:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _token_styles() -> dict:
+    """Token type -> (color, flags) for HIGHLIGHT_STYLE"""
+    styles = {}
+    for token_type, style in get_style_by_name(HIGHLIGHT_STYLE):
+        flags = (BOLD if style["bold"] else 0) | (ITALIC if style["italic"] else 0)
+        styles[token_type] = (style["color"] or None, flags)
+    return styles
+
+
+def _plain(code: str) -> tuple[Line, ...]:
+    return tuple(((line, None, 0),) if line else () for line in code.split("\n"))
+
+
+@lru_cache(maxsize=512)
+def highlight(code: str, lang: str) -> tuple[Line, ...]:
+    """Split code into lines of colored segments
+
+    Args:
+        code: Code text (without the trailing newline)
+        lang: Fence language ("" for none)
+
+    Returns:
+        One tuple of (text, color, flags) segments per line; plain segments when
+        pygments is missing or the language is unknown
+    """
+    if not HIGHLIGHT_AVAILABLE or not lang:
+        return _plain(code)
+    lexer = _lexer(lang.lower())
+    if lexer is None:
+        return _plain(code)
+
+    styles = _token_styles()
+    lines: list[list[tuple[str, str | None, int]]] = [[]]
+    for token_type, value in lex(code, lexer):
+        # 沿 token 类型层级向上查找样式
+        while token_type not in styles and token_type.parent is not None:
+            token_type = token_type.parent
+        color, flags = styles.get(token_type, (None, 0))
+        for i, part in enumerate(value.split("\n")):
+            if i > 0:
+                lines.append([])
+            if part:
+                current = lines[-1]
+                # 合并相邻同格式片段
+                if current and current[-1][1] == color and current[-1][2] == flags:
+                    current[-1] = (current[-1][0] + part, color, flags)
+                else:
+                    current.append((part, color, flags))
+    return tuple(tuple(line) for line in lines)
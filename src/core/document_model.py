@@ -0,0 +1,344 @@
+"""Intermediate document model
+
+markdown-it 的 token 流只遍历一次，生成紧凑的块 (Block) / 文本片段 (Run) 记录。
+列表栈、编号计数、标题处理都在这里完成，各个后端 (文本预览、Word 等) 只需按
+Block.kind 查表分发渲染，不再各自维护一套状态。
+
+模型与渲染设置无关，设置 (是否忽略 bullet、有序列表样式) 只在后端生效。
+"""
+
+# Block kinds
+HEADING = 0
+PARAGRAPH = 1
+TABLE = 2
+CODE_BLOCK = 3
+
+# List types
+NO_LIST = 0
+BULLET = 1
+ORDERED = 2
+
+# Run flags
+BOLD = 1
+ITALIC = 2
+CODE = 4
+BREAK = 8
+IMAGE = 16
+
+DEFAULT_SETTINGS = {
+    "ignore_bullets": True,
+    "ordered_list_style": "text",
+    "code_highlight": True,
+    # 加粗、斜体、行内代码引用模板中的字符样式 (Strong / Emphasis / Inline Code)，而不是逐个 run 直接设置格式
+    "character_styles": False,
+    # 相对图片路径的基准目录 (None 为当前目录)
+    "image_base_dir": None,
+    # 是否读取本地图片文件；为 False 时只嵌入 data: URI (HTTP 服务使用)
+    "local_images": True,
+}
+
+
+def normalize_settings(settings: dict | None) -> tuple[bool, str]:
+    """Resolve converter settings against the shared defaults
+
+    Args:
+        settings: Converter settings (may be None or partial)
+
+    Returns:
+        Tuple of (ignore_bullets, ordered_list_style); the style is lower-cased
+    """
+    settings = settings or {}
+    ignore_bullets = settings.get("ignore_bullets", DEFAULT_SETTINGS["ignore_bullets"])
+    ordered_style = settings.get("ordered_list_style") or DEFAULT_SETTINGS["ordered_list_style"]
+    return bool(ignore_bullets), str(ordered_style).lower()
+
+
+class Run:
+    """A text fragment with formatting flags, or a line break (flags & BREAK)"""
+
+    __slots__ = ("text", "flags")
+
+    def __init__(self, text: str, flags: int = 0):
+        self.text = text
+        self.flags = flags
+
+    def __repr__(self) -> str:
+        return f"Run({self.text!r}, {self.flags})"
+
+
+class ImageRun(Run):
+    """An inline image: text holds the image source, alt its alternative text"""
+
+    __slots__ = ("alt",)
+
+    def __init__(self, src: str, alt: str = ""):
+        super().__init__(src, IMAGE)
+        self.alt = alt
+
+    def __repr__(self) -> str:
+        return f"ImageRun({self.text!r}, alt={self.alt!r})"
+
+
+class Cell:
+    """A table cell: inline source (preview) and runs"""
+
+    __slots__ = ("source", "runs")
+
+    def __init__(self, source: str, runs: list[Run]):
+        self.source = source
+        self.runs = runs
+
+    def __repr__(self) -> str:
+        return f"Cell({self.source!r})"
+
+
+class Block:
+    """A block-level record: heading, paragraph (optionally a list item), table or code block"""
+
+    __slots__ = ("kind", "level", "list_type", "ordinal", "source", "runs", "raw_runs", "rows", "align", "lang")
+
+    def __init__(
+        self,
+        kind: int,
+        source: str,
+        runs: list[Run],
+        level: int = 0,
+        list_type: int = NO_LIST,
+        ordinal: int = 0,
+        raw_runs: int = 0,
+        rows: list[list[Cell]] | None = None,
+        align: list[str | None] | None = None,
+        lang: str = "",
+    ):
+        self.kind = kind
+        # 标题级别
+        self.level = level
+        # 所在最内层列表的类型及有序列表编号
+        self.list_type = list_type
+        self.ordinal = ordinal
+        # 原始 inline 内容 (预览使用)
+        self.source = source
+        self.runs = runs
+        # 合并同格式片段之前的文本片段数 (统计用)
+        self.raw_runs = raw_runs
+        # 表格: 行 (第一行为表头，每行列数与表头一致) 及每列对齐方式 ("left"/"center"/"right"/None)
+        self.rows = rows
+        self.align = align
+        # 代码块: source 为代码文本 (不含末尾空行)，lang 为围栏语言
+        self.lang = lang
+
+    def __repr__(self) -> str:
+        return f"Block(kind={self.kind}, level={self.level}, list_type={self.list_type}, ordinal={self.ordinal}, runs={self.runs!r})"
+
+
+_LINE_BREAK = Run("", BREAK)
+
+
+def build_runs(inline_token) -> tuple[list[Run], int]:
+    """Flatten an inline token into runs, turning soft/hard breaks and embedded newlines into BREAK runs
+
+    Images become ImageRun records; their alt text is not rendered as text.
+
+    Consecutive fragments with identical formatting (markdown-it splits text around
+    escapes, entities, etc.) are merged into a single run.
+
+    Returns:
+        Tuple of (runs, number of text fragments before merging)
+    """
+    runs: list[Run] = []
+    append = runs.append
+
+    if not inline_token.children:
+        # 处理纯文本 Token (无 children 结构)
+        for i, line in enumerate(inline_token.content.split("\n")):
+            if i > 0:
+                append(_LINE_BREAK)
+            if line:
+                append(Run(line))
+        return runs, sum(1 for r in runs if r is not _LINE_BREAK)
+
+    # 待合并的同格式片段
+    pending: list[str] = []
+    pending_flags = 0
+    fragments = 0
+
+    def flush() -> None:
+        if pending:
+            append(Run(pending[0] if len(pending) == 1 else "".join(pending), pending_flags))
+            pending.clear()
+
+    flags = 0
+    for child in inline_token.children:
+        ctype = child.type
+        if ctype == "text" or ctype == "code_inline":
+            run_flags = flags | CODE if ctype == "code_inline" else flags
+            # some contents also include '\n'
+            for i, part in enumerate(child.content.split("\n")):
+                if i > 0:
+                    flush()
+                    append(_LINE_BREAK)
+                if part:
+                    fragments += 1
+                    if pending and run_flags != pending_flags:
+                        flush()
+                    pending.append(part)
+                    pending_flags = run_flags
+        elif ctype == "softbreak" or ctype == "hardbreak":
+            flush()
+            append(_LINE_BREAK)
+        elif ctype == "image":
+            flush()
+            fragments += 1
+            append(ImageRun(child.attrs.get("src", ""), child.content))
+        elif ctype == "strong_open":
+            flags |= BOLD
+        elif ctype == "strong_close":
+            flags &= ~BOLD
+        elif ctype == "em_open":
+            flags |= ITALIC
+        elif ctype == "em_close":
+            flags &= ~ITALIC
+    flush()
+    return runs, fragments
+
+
+def _text_align(token) -> str | None:
+    """Column alignment from a th/td token's style attribute ("text-align:center")"""
+    style = token.attrs.get("style") if token.attrs else None
+    if style and style.startswith("text-align:"):
+        return style[11:]
+    return None
+
+
+def build_table(tokens, idx: int) -> tuple[Block, int]:
+    """Build a TABLE block from the tokens starting at table_open
+
+    Args:
+        tokens: Token stream
+        idx: Index of the table_open token
+
+    Returns:
+        Tuple of (block, index of the matching table_close)
+    """
+    rows: list[list[Cell]] = []
+    align: list[str | None] = []
+    raw_runs = 0
+    row: list[Cell] = []
+    header = False
+    n = len(tokens)
+    idx += 1
+    while idx < n:
+        ttype = tokens[idx].type
+        if ttype == "table_close":
+            break
+        if ttype == "tr_open":
+            row = []
+        elif ttype == "tr_close":
+            rows.append(row)
+        elif ttype == "thead_open":
+            header = True
+        elif ttype == "thead_close":
+            header = False
+        elif ttype == "th_open" or ttype == "td_open":
+            if header:
+                align.append(_text_align(tokens[idx]))
+        elif ttype == "inline":
+            runs, fragments = build_runs(tokens[idx])
+            if header:
+                # 表头加粗
+                runs = [r if r.flags & BREAK else Run(r.text, r.flags | BOLD) for r in runs]
+            raw_runs += fragments
+            row.append(Cell(tokens[idx].content, runs))
+        idx += 1
+    return Block(TABLE, "", [], raw_runs=raw_runs, rows=rows, align=align), idx
+
+
+def build_blocks(tokens) -> list[Block]:
+    """Build the block list from a markdown-it token stream in a single pass
+
+    Args:
+        tokens: Tokens from MarkdownIt.parse
+
+    Returns:
+        List of blocks in document order
+    """
+    blocks: list[Block] = []
+    list_stack: list[int] = []
+    ordered_counters: list[int] = []
+
+    idx = 0
+    n = len(tokens)
+    while idx < n:
+        token = tokens[idx]
+        ttype = token.type
+
+        if ttype == "inline":
+            # 正文/列表项
+            list_type = list_stack[-1] if list_stack else NO_LIST
+            ordinal = 0
+            if list_type == ORDERED:
+                ordinal = ordered_counters[-1]
+                ordered_counters[-1] += 1
+            runs, raw_runs = build_runs(token)
+            blocks.append(Block(PARAGRAPH, token.content, runs, list_type=list_type, ordinal=ordinal, raw_runs=raw_runs))
+
+        elif ttype == "heading_open":
+            if idx + 1 < n and tokens[idx + 1].type == "inline":
+                inline = tokens[idx + 1]
+                runs, raw_runs = build_runs(inline)
+                blocks.append(Block(HEADING, inline.content, runs, level=int(token.tag[1]), raw_runs=raw_runs))
+                idx += 1
+
+        elif ttype == "fence" or ttype == "code_block":
+            lang = token.info.split(maxsplit=1)[0] if ttype == "fence" and token.info.strip() else ""
+            # 末尾空行不影响显示 (未闭合的围栏会吞掉文末空行)
+            code = token.content.rstrip("\n")
+            blocks.append(Block(CODE_BLOCK, code, [], list_type=list_stack[-1] if list_stack else NO_LIST, lang=lang))
+
+        elif ttype == "table_open":
+            block, idx = build_table(tokens, idx)
+            blocks.append(block)
+
+        elif ttype == "bullet_list_open":
+            list_stack.append(BULLET)
+        elif ttype == "ordered_list_open":
+            list_stack.append(ORDERED)
+            start = token.attrs.get("start", 1) if token.attrs else 1
+            ordered_counters.append(start)
+        elif ttype == "bullet_list_close" or ttype == "ordered_list_close":
+            if list_stack:
+                list_stack.pop()
+            if ttype == "ordered_list_close" and ordered_counters:
+                ordered_counters.pop()
+
+        idx += 1
+
+    return blocks
+
+
+class DocumentModel:
+    """Parsed document: the block list plus counters shared by all backends"""
+
+    __slots__ = ("blocks",)
+
+    def __init__(self, blocks: list[Block]):
+        self.blocks = blocks
+
+    @classmethod
+    def from_tokens(cls, tokens) -> "DocumentModel":
+        """Build a model from a markdown-it token stream"""
+        return cls(build_blocks(tokens))
+
+    @property
+    def raw_run_count(self) -> int:
+        """Number of text fragments before same-format runs were merged"""
+        return sum(b.raw_runs for b in self.blocks)
+
+    @property
+    def run_count(self) -> int:
+        """Number of text runs after merging"""
+        count = 0
+        for b in self.blocks:
+            runs = b.runs if b.rows is None else [r for row in b.rows for cell in row for r in cell.runs]
+            count += sum(1 for r in runs if not r.flags & BREAK)
+        return count
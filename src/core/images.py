@@ -0,0 +1,299 @@
+"""Image loading and embedding helpers
+
+Markdown 图片 (本地路径与 data: URI) 在渲染前统一收集，用线程池并发读取/解码，
+只解析文件头获取格式与像素尺寸，不解码像素数据。内容按 sha256 去重：同一张图片
+无论被引用多少次、以什么路径引用，在 word/media 中都只保存一份。
+"""
+
+import base64
+import hashlib
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+from urllib.request import url2pathname
+from xml.sax.saxutils import quoteattr
+
+from .document_model import IMAGE, Block
+
+# 图片读取线程数上限
+MAX_LOAD_WORKERS = 8
+
+# 没有分辨率信息时按 96 DPI 换算
+_EMU_PER_PIXEL = 9525
+_EMU_PER_TWIP = 635
+
+# 格式 -> (扩展名, MIME)
+IMAGE_TYPES = {
+    "png": ("png", "image/png"),
+    "jpeg": ("jpg", "image/jpeg"),
+    "gif": ("gif", "image/gif"),
+}
+
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class ImageData:
+    """A loaded image: content, content hash and probed header info"""
+
+    __slots__ = ("data", "sha", "format", "width", "height")
+
+    def __init__(self, data: bytes, fmt: str, width: int, height: int):
+        self.data = data
+        self.sha = hashlib.sha256(data).hexdigest()
+        self.format = fmt
+        self.width = width
+        self.height = height
+
+    @property
+    def ext(self) -> str:
+        return IMAGE_TYPES[self.format][0]
+
+    @property
+    def content_type(self) -> str:
+        return IMAGE_TYPES[self.format][1]
+
+    def extent(self, max_width_twips: int) -> tuple[int, int]:
+        """Display size in EMU at 96 DPI, scaled down to fit the text width"""
+        cx = max(1, self.width) * _EMU_PER_PIXEL
+        cy = max(1, self.height) * _EMU_PER_PIXEL
+        max_cx = max_width_twips * _EMU_PER_TWIP
+        if cx > max_cx:
+            cy = cy * max_cx // cx
+            cx = max_cx
+        return cx, cy
+
+
+def probe_image(data: bytes) -> tuple[str, int, int] | None:
+    """Read format and pixel size from the image header
+
+    Args:
+        data: Image file content
+
+    Returns:
+        Tuple of (format, width, height), or None for unsupported/corrupt images
+    """
+    # 截断的文件头按损坏处理，不能让 struct.error 中断整个转换
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        if len(data) < 24:
+            return None
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) < 10:
+            return None
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+
+    if data[:2] == b"\xff\xd8":
+        # 逐个跳过 JPEG 段，直到帧头 (SOFn)
+        i, n = 2, len(data)
+        # 段头 (FF xx 及 2 字节长度) 完整时才读取
+        while i + 4 <= n:
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            (length,) = struct.unpack(">H", data[i + 2:i + 4])
+            if marker in _JPEG_SOF and i + 9 <= n:
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return "jpeg", width, height
+            i += 2 + length
+    return None
+
+
+def read_image_source(src: str, base_dir: str | None = None, local_files: bool = True) -> bytes | None:
+    """Read the bytes of a data: URI or local image path
+
+    Args:
+        src: Image source from Markdown
+        base_dir: Directory that relative paths are resolved against
+        local_files: Whether local paths may be read; when False only data: URIs are embedded
+
+    Returns:
+        Image bytes, or None for remote URLs, disallowed local paths and unreadable sources
+    """
+    if src.startswith("data:"):
+        header, sep, payload = src[5:].partition(",")
+        if not sep:
+            return None
+        try:
+            if header.endswith(";base64"):
+                return base64.b64decode(payload, validate=False)
+            return unquote(payload).encode("latin-1")
+        except (ValueError, UnicodeEncodeError):
+            return None
+    path = local_image_path(src, base_dir) if local_files else None
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def local_image_path(src: str, base_dir: str | None = None) -> str | None:
+    """Filesystem path of a local image source
+
+    Args:
+        src: Image source from Markdown
+        base_dir: Directory that relative paths are resolved against
+
+    Returns:
+        Path (not checked for existence), or None for data: URIs and remote URLs
+    """
+    if src.startswith("data:"):
+        return None
+    parts = urlsplit(src)
+    if parts.scheme == "file":
+        path = url2pathname(parts.path)
+    elif parts.scheme and len(parts.scheme) > 1:
+        # http(s) 等远程图片不下载
+        return None
+    else:
+        # 无 scheme，或 Windows 盘符 (C:\...)
+        path = unquote(src)
+    path = os.path.expanduser(path)
+    if base_dir and not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+    return path
+
+
+def local_image_identities(sources: list[str], base_dir: str | None = None) -> list[tuple]:
+    """Identify the current content of the local image files among sources
+
+    Returns:
+        List of (resolved path, mtime_ns, size) in source order; missing files have
+        None for mtime_ns and size
+    """
+    identities = []
+    for src in sources:
+        path = local_image_path(src, base_dir)
+        if path is None:
+            continue
+        path = os.path.realpath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            identities.append((path, None, None))
+        else:
+            identities.append((path, st.st_mtime_ns, st.st_size))
+    return identities
+
+
+def load_image(src: str, base_dir: str | None = None, local_files: bool = True) -> ImageData | None:
+    """Read and probe one image source; None if it cannot be embedded"""
+    data = read_image_source(src, base_dir, local_files)
+    if not data:
+        return None
+    info = probe_image(data)
+    if info is None:
+        return None
+    return ImageData(data, *info)
+
+
+def collect_image_sources(blocks: list[Block]) -> list[str]:
+    """Unique image sources referenced by blocks, in document order"""
+    seen: dict[str, None] = {}
+    for block in blocks:
+        runs = block.runs if block.rows is None else [r for row in block.rows for cell in row for r in cell.runs]
+        for r in runs:
+            if r.flags & IMAGE:
+                seen.setdefault(r.text, None)
+    return list(seen)
+
+
+def load_images(
+    sources: list[str], base_dir: str | None = None, local_files: bool = True
+) -> dict[str, ImageData | None]:
+    """Load image sources concurrently
+
+    Args:
+        sources: Unique image sources
+        base_dir: Directory that relative paths are resolved against
+        local_files: Whether local paths may be read, see read_image_source
+
+    Returns:
+        Dict of source -> ImageData (None when the source cannot be embedded)
+    """
+    if not sources:
+        return {}
+    if len(sources) == 1:
+        return {sources[0]: load_image(sources[0], base_dir, local_files)}
+    with ThreadPoolExecutor(max_workers=min(MAX_LOAD_WORKERS, len(sources))) as pool:
+        return dict(zip(sources, pool.map(lambda src: load_image(src, base_dir, local_files), sources)))
+
+
+def inline_image_xml(rid: str, shape_id: int, cx: int, cy: int, alt: str = "") -> str:
+    """Serialize an inline picture run (w:r/w:drawing) with its own namespace declarations"""
+    descr = quoteattr(alt)
+    return (
+        "<w:r><w:drawing>"
+        '<wp:inline distT="0" distB="0" distL="0" distR="0"'
+        ' xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+        ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+        ' xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"'
+        ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<wp:extent cx="{cx}" cy="{cy}"/>'
+        f'<wp:docPr id="{shape_id}" name="Picture {shape_id}" descr={descr}/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic><pic:nvPicPr><pic:cNvPr id="0" name="image{shape_id}"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+        "</a:graphicData></a:graphic></wp:inline></w:drawing></w:r>"
+    )
+
+
+class ImageEmbedder:
+    """Turns ImageRun records into inline picture XML, adding each distinct image once
+
+    Subclasses implement ``_add_part`` for their package (python-docx or raw zip).
+    """
+
+    def __init__(self, text_width: int, base_dir: str | None = None, local_files: bool = True):
+        """Initialize embedder
+
+        Args:
+            text_width: Available width in twips (larger images are scaled down)
+            base_dir: Directory that relative image paths are resolved against
+            local_files: Whether local image paths may be read, see read_image_source
+        """
+        self.text_width = text_width
+        self.base_dir = base_dir
+        self.local_files = local_files
+        self.images: dict[str, ImageData | None] = {}
+        # sha256 -> relationship ID
+        self._rids: dict[str, str] = {}
+        self._next_shape_id = 1
+
+    def prepare(self, blocks: list[Block]) -> None:
+        """Load (concurrently) every image referenced by blocks that is not loaded yet"""
+        pending = [src for src in collect_image_sources(blocks) if src not in self.images]
+        if pending:
+            self.images.update(load_images(pending, self.base_dir, self.local_files))
+
+    def run_xml(self, run) -> str:
+        """Serialize an ImageRun; images that cannot be embedded render nothing"""
+        image = self.images.get(run.text)
+        if image is None:
+            return ""
+        rid = self._rids.get(image.sha)
+        if rid is None:
+            rid = self._rids[image.sha] = self._add_part(image)
+        cx, cy = image.extent(self.text_width)
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        return inline_image_xml(rid, shape_id, cx, cy, run.alt)
+
+    def _add_part(self, image: ImageData) -> str:
+        """Add the image to the package and return its relationship ID"""
+        raise NotImplementedError
@@ -0,0 +1,230 @@
+"""WordprocessingML string fragments shared by the Word backends
+
+直接拼接 XML 字符串比逐个创建 python-docx 对象快得多。OoxmlWriter 用这些片段生成
+整个 document.xml；WordRenderer 在表格等大块结构上也用它们一次性生成 XML 再解析插入，
+避免 add_row / cell() 的逐格开销。
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Sequence
+from xml.sax.saxutils import escape
+
+from .code_highlight import highlight
+from .document_model import BOLD, BREAK, CODE, IMAGE, ITALIC, Block, Run
+
+CODE_FONT = "Courier New"
+
+# 模板中找不到页面尺寸时的正文宽度 (twips，Letter 纸 1.25 英寸页边距)
+DEFAULT_TEXT_WIDTH = 8640
+
+# XML 1.0 不允许的控制字符 (python-docx 会直接报错，这里丢弃)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+_TABLE_BORDERS = "".join(
+    f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="auto"/>'
+    for side in ("top", "left", "bottom", "right", "insideH", "insideV")
+)
+
+_JC = {"left": "left", "center": "center", "right": "right"}
+
+
+def _build_rpr_table() -> list[str]:
+    """Precompute run properties for every BOLD/ITALIC/CODE flag combination
+
+    Matches what python-docx emits for run.bold/run.italic/run.font.name in WordRenderer.
+    """
+    table = []
+    for flags in range(8):
+        rpr = "<w:rPr>"
+        if flags & CODE:
+            rpr += f'<w:rFonts w:ascii="{CODE_FONT}" w:hAnsi="{CODE_FONT}"/>'
+        rpr += "<w:b/>" if flags & BOLD else '<w:b w:val="0"/>'
+        rpr += "<w:i/>" if flags & ITALIC else '<w:i w:val="0"/>'
+        rpr += "</w:rPr>"
+        table.append(rpr)
+    return table
+
+
+RPR = _build_rpr_table()
+
+
+def character_run_plan(
+    strong_id: str | None, emphasis_id: str | None, code_id: str | None
+) -> list[tuple[str | None, bool, bool, bool]]:
+    """Plan run formatting for every BOLD/ITALIC/CODE flag combination in character style mode
+
+    The run references one character style: the inline code style for code, else Strong
+    for bold, else Emphasis for italic. Flags that the style does not cover (or whose style
+    is missing) are set directly, e.g. bold italic -> Strong + direct italic. Plain runs
+    carry no properties at all.
+
+    Returns:
+        List indexed by flags & 7 of (style ID or None, direct bold, direct italic, direct code font)
+    """
+    plan = []
+    for flags in range(8):
+        style_id, covered = None, 0
+        for flag, candidate in ((CODE, code_id), (BOLD, strong_id), (ITALIC, emphasis_id)):
+            if flags & flag and candidate:
+                style_id, covered = candidate, flag
+                break
+        rest = flags & ~covered
+        plan.append((style_id, bool(rest & BOLD), bool(rest & ITALIC), bool(rest & CODE)))
+    return plan
+
+
+@lru_cache(maxsize=16)
+def character_rpr_table(strong_id: str | None, emphasis_id: str | None, code_id: str | None) -> tuple[str, ...]:
+    """Run properties for every flag combination in character style mode (see character_run_plan)
+
+    Matches what WordRenderer emits for the same plan.
+    """
+    table = []
+    for style_id, bold, italic, code in character_run_plan(strong_id, emphasis_id, code_id):
+        rpr = f'<w:rStyle w:val="{style_id}"/>' if style_id else ""
+        if code:
+            rpr += f'<w:rFonts w:ascii="{CODE_FONT}" w:hAnsi="{CODE_FONT}"/>'
+        if bold:
+            rpr += "<w:b/>"
+        if italic:
+            rpr += "<w:i/>"
+        table.append(f"<w:rPr>{rpr}</w:rPr>" if rpr else "")
+    return tuple(table)
+
+
+def text_xml(text: str) -> str:
+    """Serialize run text as w:t elements, turning tabs into w:tab"""
+    if _INVALID_XML_CHARS.search(text):
+        text = _INVALID_XML_CHARS.sub("", text)
+    parts = []
+    for i, piece in enumerate(text.split("\t")):
+        if i > 0:
+            parts.append("<w:tab/>")
+        if piece:
+            if piece[0].isspace() or piece[-1].isspace():
+                parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+            else:
+                parts.append(f"<w:t>{escape(piece)}</w:t>")
+    return "".join(parts)
+
+
+def runs_xml(
+    runs: list[Run],
+    break_xml: str = "</w:p><w:p>",
+    image_xml: Callable[[Run], str] | None = None,
+    rpr: Sequence[str] = RPR,
+) -> str:
+    """Serialize runs; each BREAK emits break_xml (by default: close the paragraph, open an unstyled one)
+
+    Image runs are serialized by image_xml (see ImageEmbedder.run_xml) and dropped without it.
+    rpr maps flags & 7 to run properties: RPR (direct formatting) or a character_rpr_table.
+    """
+    parts = []
+    for r in runs:
+        flags = r.flags
+        if flags & BREAK:
+            parts.append(break_xml)
+        elif flags & IMAGE:
+            if image_xml is not None:
+                parts.append(image_xml(r))
+        else:
+            parts.append(f"<w:r>{rpr[flags & 7]}{text_xml(r.text)}</w:r>")
+    return "".join(parts)
+
+
+def section_text_width(document) -> int:
+    """Width between the margins of the last section, in twips
+
+    Args:
+        document: python-docx Document
+    """
+    try:
+        section = document.sections[-1]
+        width = section.page_width - section.left_margin - section.right_margin
+    except (IndexError, TypeError):
+        return DEFAULT_TEXT_WIDTH
+    return int(width) // 635 if width > 0 else DEFAULT_TEXT_WIDTH
+
+
+def table_xml(
+    block: Block,
+    text_width: int,
+    style_id: str | None = None,
+    namespaces: str = "",
+    image_xml: Callable[[Run], str] | None = None,
+    rpr: Sequence[str] = RPR,
+) -> str:
+    """Serialize a TABLE block as a complete w:tbl element in one pass
+
+    Columns share the text width equally; the header row repeats on every page.
+    Without a table style, single borders are set directly.
+
+    Args:
+        block: TABLE block
+        text_width: Available width in twips
+        style_id: Table style ID (e.g. "Table Grid"), or None
+        namespaces: Namespace declarations for the root element (for standalone parsing)
+        image_xml: Serializer for image runs in cells, see runs_xml
+        rpr: Run properties table for cell runs, see runs_xml
+    """
+    rows = block.rows
+    cols = max(1, len(rows[0]) if rows else 1)
+    col_width = text_width // cols
+
+    if style_id:
+        tbl_pr = f'<w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+    else:
+        tbl_pr = f'<w:tblW w:type="auto" w:w="0"/><w:tblBorders>{_TABLE_BORDERS}</w:tblBorders>'
+    grid = f'<w:gridCol w:w="{col_width}"/>' * cols
+    tc_pr = f'<w:tcPr><w:tcW w:type="dxa" w:w="{col_width}"/></w:tcPr>'
+
+    # 每列的段落开头 (对齐方式)
+    p_opens = []
+    for i in range(cols):
+        jc = _JC.get(block.align[i]) if i < len(block.align) else None
+        p_opens.append(f'<w:p><w:pPr><w:jc w:val="{jc}"/></w:pPr>' if jc else "<w:p>")
+
+    parts = [f"<w:tbl{namespaces}><w:tblPr>{tbl_pr}<w:tblLook w:val=\"04A0\"/></w:tblPr><w:tblGrid>{grid}</w:tblGrid>"]
+    append = parts.append
+    for r, row in enumerate(rows):
+        append("<w:tr><w:trPr><w:tblHeader/></w:trPr>" if r == 0 else "<w:tr>")
+        for i, cell in enumerate(row):
+            p_open = p_opens[i] if i < cols else "<w:p>"
+            append(f"<w:tc>{tc_pr}{p_open}{runs_xml(cell.runs, '</w:p>' + p_open, image_xml, rpr)}</w:p></w:tc>")
+        append("</w:tr>")
+    append("</w:tbl>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _code_rpr(color: str | None, flags: int) -> str:
+    """Run properties of a highlighted code segment"""
+    rpr = RPR[CODE | (flags & (BOLD | ITALIC))]
+    if color:
+        rpr = rpr.replace("</w:rPr>", f'<w:color w:val="{color.lstrip("#").upper()}"/></w:rPr>')
+    return rpr
+
+
+def code_block_xml(block: Block, style_id: str | None = None, colored: bool = True, namespaces: str = "") -> str:
+    """Serialize a CODE_BLOCK as one monospaced paragraph per code line
+
+    Args:
+        block: CODE_BLOCK block
+        style_id: Code paragraph style ID (e.g. "Source Code"), or None for tight unstyled paragraphs
+        colored: Whether to apply syntax colors (needs pygments)
+        namespaces: Namespace declarations for each w:p (for standalone parsing)
+    """
+    if style_id:
+        p_open = f'<w:p{namespaces}><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+    else:
+        p_open = f'<w:p{namespaces}><w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr>'
+
+    parts = []
+    append = parts.append
+    for line in highlight(block.source, block.lang if colored else ""):
+        append(p_open)
+        for text, color, flags in line:
+            append(f"<w:r>{_code_rpr(color, flags)}{text_xml(text)}</w:r>")
+        append("</w:p>")
+    return "".join(parts)
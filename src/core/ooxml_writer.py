@@ -0,0 +1,231 @@
+"""Direct OOXML Word backend
+
+不经过 python-docx 的对象层，直接把中间文档模型序列化为 word/document.xml 的
+字符串并增量写入 zip 流；模板包中的其他部件原样复制。输出与 WordRenderer
+(参考实现) 一致，但省去了每个段落、每个 run 的代理对象和属性 setter 开销。
+"""
+
+import os
+import re
+import zipfile
+from typing import IO
+
+from .document_model import (
+    BULLET,
+    CODE_BLOCK,
+    DEFAULT_SETTINGS,
+    HEADING,
+    ORDERED,
+    PARAGRAPH,
+    TABLE,
+    Block,
+    normalize_settings,
+)
+from .images import ImageData, ImageEmbedder
+from .ooxml_fragments import RPR, character_rpr_table, code_block_xml, runs_xml, table_xml, text_xml
+from .template_cache import DOCUMENT_PART, EXPORT, TemplatePackage, zip_compression
+
+# 每累计这么多字符就写入一次 zip 流
+_FLUSH_THRESHOLD = 1 << 16
+
+DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+_IMAGE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+_REL_ID = re.compile(r'\bId="([^"]+)"')
+_TYPES_OPEN = re.compile(r"<Types\b[^>]*>")
+_MEDIA_INDEX = re.compile(r"word/media/image(\d+)\.\w+$")
+
+
+class OoxmlImageEmbedder(ImageEmbedder):
+    """Collects media parts and relationships for the raw package, named like python-docx does"""
+
+    def __init__(
+        self, text_width: int, base_dir: str | None, part_names: list[str], rels_xml: str, local_files: bool = True
+    ):
+        super().__init__(text_width, base_dir, local_files)
+        # 已占用的 media 编号 (python-docx 对所有扩展名统一编号)
+        self._media_indexes = {int(m.group(1)) for m in map(_MEDIA_INDEX.match, part_names) if m}
+        self._rel_ids = set(_REL_ID.findall(rels_xml))
+        # (zip 内名称, 数据), 关系 XML
+        self.media: list[tuple[str, bytes]] = []
+        self.relationships: list[str] = []
+        self.extensions: dict[str, str] = {}
+
+    def _add_part(self, image: ImageData) -> str:
+        # 与 python-docx 相同: 使用最小的未占用编号
+        for n in range(1, len(self._rel_ids) + 2):
+            rid = f"rId{n}"
+            if rid not in self._rel_ids:
+                break
+        index = 1
+        while index in self._media_indexes:
+            index += 1
+        self._rel_ids.add(rid)
+        self._media_indexes.add(index)
+        target = f"media/image{index}.{image.ext}"
+        self.media.append((f"word/{target}", image.data))
+        self.relationships.append(f'<Relationship Id="{rid}" Type="{_IMAGE_REL_TYPE}" Target="{target}"/>')
+        self.extensions[image.ext] = image.content_type
+        return rid
+
+    def patch_rels(self, rels_xml: str) -> str:
+        """Add the image relationships to word/_rels/document.xml.rels"""
+        if not self.relationships:
+            return rels_xml
+        return rels_xml.replace("</Relationships>", "".join(self.relationships) + "</Relationships>")
+
+    def patch_content_types(self, types_xml: str) -> str:
+        """Declare content types for the image extensions that are not declared yet"""
+        defaults = "".join(
+            f'<Default Extension="{ext}" ContentType="{content_type}"/>'
+            for ext, content_type in self.extensions.items()
+            if not re.search(f'Extension="{ext}"', types_xml, re.IGNORECASE)
+        )
+        m = _TYPES_OPEN.search(types_xml)
+        if not defaults or m is None:
+            return types_xml
+        return types_xml[:m.end()] + defaults + types_xml[m.end():]
+
+
+class OoxmlWriter:
+    """Writes a .docx package with word/document.xml serialized directly from document blocks
+
+    Usage: ``write()`` blocks (possibly in several batches), then ``close()``.
+    """
+
+    def __init__(
+        self,
+        package: TemplatePackage,
+        output: "str | os.PathLike | IO[bytes]",
+        settings: dict | None = None,
+        save_profile: str = EXPORT,
+    ):
+        """Initialize writer and copy the template parts
+
+        Args:
+            package: Raw template parts from TemplateCache.get_package
+            output: Output path or binary file object
+            settings: Converter settings
+            save_profile: "export" (deflate) or "preview" (stored zip entries)
+        """
+        self.ignore_bullets, self.ordered_style = normalize_settings(settings)
+        self.code_highlight = bool((settings or {}).get("code_highlight", DEFAULT_SETTINGS["code_highlight"]))
+        self._heading_styles = package.styles.heading_ids
+        self._list_style = package.styles.list_id
+        self._table_style = package.styles.table_id
+        self._code_style = package.styles.code_paragraph_id
+        self._text_width = package.text_width
+        self._tail = package.document_tail
+        if (settings or {}).get("character_styles", DEFAULT_SETTINGS["character_styles"]):
+            styles = package.styles
+            self._rpr = character_rpr_table(styles.strong_id, styles.emphasis_id, styles.code_char_id)
+        else:
+            self._rpr = RPR
+        self._handlers = {
+            HEADING: self._heading,
+            PARAGRAPH: self._paragraph,
+            TABLE: self._table,
+            CODE_BLOCK: self._code_block,
+        }
+
+        # 关系与内容类型在 close() 时补上图片后再写入
+        self._deferred = {
+            name: data for name, data in package.parts if name in (DOCUMENT_RELS_PART, CONTENT_TYPES_PART)
+        }
+        self.images = OoxmlImageEmbedder(
+            self._text_width,
+            (settings or {}).get("image_base_dir", DEFAULT_SETTINGS["image_base_dir"]),
+            [name for name, _ in package.parts],
+            self._deferred.get(DOCUMENT_RELS_PART, b"").decode("utf-8"),
+            bool((settings or {}).get("local_images", DEFAULT_SETTINGS["local_images"])),
+        )
+
+        self._zip = zipfile.ZipFile(output, "w", compression=zip_compression(save_profile))
+        for name, data in package.parts:
+            if name not in self._deferred:
+                self._zip.writestr(name, data)
+
+        self._stream = self._zip.open(DOCUMENT_PART, "w", force_zip64=True)
+        self._stream.write(package.document_head)
+        self.bytes_written = len(package.document_head)
+        self._buf: list[str] = []
+        self._buf_size = 0
+
+    def write(self, blocks: list[Block]) -> None:
+        """Serialize blocks into the document body
+
+        Args:
+            blocks: Blocks from the document model
+        """
+        handlers = self._handlers
+        self.images.prepare(blocks)
+        for block in blocks:
+            handlers[block.kind](block)
+            if self._buf_size >= _FLUSH_THRESHOLD:
+                self._flush()
+
+    def close(self) -> None:
+        """Finish document.xml and close the package"""
+        self._flush()
+        self._stream.write(self._tail)
+        self.bytes_written += len(self._tail)
+        self._stream.close()
+
+        images = self.images
+        for name, data in images.media:
+            self._zip.writestr(name, data)
+        for name, data in self._deferred.items():
+            if name == DOCUMENT_RELS_PART:
+                data = images.patch_rels(data.decode("utf-8")).encode("utf-8")
+            elif name == CONTENT_TYPES_PART:
+                data = images.patch_content_types(data.decode("utf-8")).encode("utf-8")
+            self._zip.writestr(name, data)
+        self._zip.close()
+
+    def abort(self) -> None:
+        """Close the underlying zip without finishing the document"""
+        try:
+            self._stream.close()
+        finally:
+            self._zip.close()
+
+    def _flush(self) -> None:
+        if self._buf:
+            data = "".join(self._buf).encode("utf-8")
+            self._stream.write(data)
+            self.bytes_written += len(data)
+            self._buf = []
+            self._buf_size = 0
+
+    def _emit(self, xml: str) -> None:
+        self._buf.append(xml)
+        self._buf_size += len(xml)
+
+    def _heading(self, block: Block) -> None:
+        style_id = self._heading_styles.get(block.level)
+        p_open = f'<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>' if style_id else "<w:p>"
+        self._emit(p_open + runs_xml(block.runs, image_xml=self.images.run_xml, rpr=self._rpr) + "</w:p>")
+
+    def _paragraph(self, block: Block) -> None:
+        p_open = "<w:p>"
+        prefix = ""
+        if block.list_type == BULLET:
+            if not self.ignore_bullets:
+                prefix = "• "
+        elif block.list_type == ORDERED:
+            if self.ordered_style == "list" and self._list_style:
+                p_open = f'<w:p><w:pPr><w:pStyle w:val="{self._list_style}"/></w:pPr>'
+            elif self.ordered_style in ("text", "list"):
+                # 模板中没有 List 样式时回退到手动编号
+                prefix = f"{block.ordinal}. "
+
+        prefix_xml = f"<w:r>{text_xml(prefix)}</w:r>" if prefix else ""
+        self._emit(p_open + prefix_xml + runs_xml(block.runs, image_xml=self.images.run_xml, rpr=self._rpr) + "</w:p>")
+
+    def _table(self, block: Block) -> None:
+        self._emit(
+            table_xml(block, self._text_width, self._table_style, image_xml=self.images.run_xml, rpr=self._rpr)
+        )
+
+    def _code_block(self, block: Block) -> None:
+        self._emit(code_block_xml(block, self._code_style, self.code_highlight))
@@ -0,0 +1,129 @@
+"""Parallel parsing of very large Markdown documents
+
+单次 ``md.parse`` 是单线程、CPU 密集的。超大输入按顶层块边界切分 (见
+iter_block_chunks，列表、围栏代码块与 HTML 块不会被切开)，各段在进程池中分别
+tokenize 并构建中间文档模型，再按原顺序拼接。
+
+跨段的状态只有链接引用定义 (``[label]: url``)：它们对整篇文档生效，且可以出现在
+引用之后。第一轮各段返回自己收集到的定义；若合并后的定义表与某段自己的不同，该段
+带着完整定义表重新解析一次 (CommonMark 规则: 同名定义以第一个为准)。
+"""
+
+import os
+from typing import TYPE_CHECKING, Callable
+
+from markdown_it import MarkdownIt
+
+from .document_model import Block, DocumentModel, build_blocks
+from .streaming import iter_block_chunks, iter_lines
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# 超过该字符数才值得启动进程池
+PARALLEL_THRESHOLD = 8 << 20
+# 每段的目标字符数
+PARALLEL_CHUNK_SIZE = 2 << 20
+
+# 工作进程内的解析器 (首次使用时创建)
+_parser: MarkdownIt | None = None
+
+
+def create_parser() -> MarkdownIt:
+    """Create the markdown-it parser used by every conversion path"""
+    # 启用 breaks=True 以支持软回车硬换行
+    md = MarkdownIt('commonmark', {'breaks': True})
+    # GFM 表格
+    md.enable('table')
+    return md
+
+
+def _parse_chunk(chunk: str, references: dict | None = None) -> tuple[list[Block], dict, int]:
+    """Parse one chunk in a worker process
+
+    Returns:
+        Tuple of (blocks, link reference definitions found, token count)
+    """
+    global _parser
+    if _parser is None:
+        _parser = create_parser()
+    env = {"references": dict(references)} if references else {}
+    tokens = _parser.parse(chunk, env)
+    return build_blocks(tokens), env.get("references", {}), len(tokens)
+
+
+def split_chunks(md_text: str, chunk_size: int = PARALLEL_CHUNK_SIZE) -> list[str]:
+    """Split Markdown text at top-level block boundaries"""
+    return list(iter_block_chunks(iter_lines((md_text,)), chunk_size))
+
+
+def parse_parallel(
+    md_text: str,
+    workers: int | None = None,
+    chunk_size: int = PARALLEL_CHUNK_SIZE,
+    executor: "Executor | None" = None,
+    check_cancel: Callable[[], None] | None = None,
+) -> tuple[DocumentModel, int]:
+    """Parse Markdown on a process pool
+
+    Args:
+        md_text: Markdown text
+        workers: Number of worker processes, defaults to CPU count (ignored with executor)
+        chunk_size: Target characters per chunk
+        executor: Existing pool to use instead of a temporary one
+        check_cancel: Called after each chunk is parsed; raising from it aborts the parse
+            (a temporary pool drops the chunks it has not started)
+
+    Returns:
+        Tuple of (document model, total token count); the blocks are the same as
+        parsing the whole text at once
+    """
+    chunks = split_chunks(md_text, chunk_size)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    if executor is None and workers == 1:
+        results = _parse_chunks(chunks, map, check_cancel)
+        return _merge(results), sum(r[2] for r in results)
+
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+    else:
+        pool = executor
+    try:
+        results = _parse_chunks(chunks, pool.map, check_cancel)
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+
+    return _merge(results), sum(r[2] for r in results)
+
+
+def _parse_chunks(
+    chunks: list[str], map_fn, check_cancel: Callable[[], None] | None = None
+) -> list[tuple[list[Block], dict, int]]:
+    """Parse chunks with map_fn, then re-parse the ones that use link references defined in other chunks"""
+    results = []
+    # map 按顺序逐个返回结果 (内置 map 是惰性的)，每段之后检查取消
+    for result in map_fn(_parse_chunk, chunks):
+        results.append(result)
+        if check_cancel is not None:
+            check_cancel()
+
+    references: dict = {}
+    for _, refs, _ in results:
+        for label, ref in refs.items():
+            references.setdefault(label, ref)
+    if references:
+        redo = [i for i, (_, refs, _) in enumerate(results) if refs != references and "[" in chunks[i]]
+        for i, result in zip(redo, map_fn(_parse_chunk, [chunks[i] for i in redo], [references] * len(redo))):
+            results[i] = result
+    return results
+
+
+def _merge(results: list[tuple[list[Block], dict, int]]) -> DocumentModel:
+    """Concatenate chunk blocks in document order"""
+    blocks: list[Block] = []
+    for chunk_blocks, _, _ in results:
+        blocks.extend(chunk_blocks)
+    return DocumentModel(blocks)
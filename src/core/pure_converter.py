@@ -1,18 +1,130 @@
+import io
 import os
-from typing import TYPE_CHECKING
-from docx import Document
-from markdown_it import MarkdownIt
-from docx.document import Document as DocumentObject
+import threading
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable
+
+from .document_model import DEFAULT_SETTINGS, DocumentModel
+from .images import collect_image_sources, local_image_identities
+from .parallel_parse import PARALLEL_THRESHOLD, create_parser, parse_parallel
+from .result_cache import ResultCache, result_key
+from .stats import NULL_STATS, PARSE, RENDER, SAVE, TEMPLATE, ConversionStats
+from .style_index import StyleIndex
+from .text_renderer import TextRenderer
+from .streaming import DEFAULT_CHUNK_SIZE, StreamingDocxWriter, iter_block_chunks, iter_lines
+
+# python-docx / lxml 只在第一次生成 Word 时导入，预览和应用启动不需要它们
+if TYPE_CHECKING:
+    from docx.document import Document as DocumentObject
+
+    from .template_cache import TemplateCache
+
+
+# 覆盖常见语法，确保解析器各规则都已初始化
+WARMUP_TEXT = "# warm\n\n**a** *b* `c`\n\n1. one\n2. two\n\n- item\n\n| a |\n|---|\n| b |\n"
+
+# 解析结果缓存的条目数：设置变化、预览与导出都复用最近解析过的文本
+PARSE_CACHE_SIZE = 2
+
+# 报告进度时正文最多分成多少批渲染 (每批结束时回调一次并检查取消)
+PROGRESS_STEPS = 200
+# 可取消的解析按此大小 (字符) 分段，每段之后检查取消
+CANCELLABLE_PARSE_CHUNK = 1 << 20
+
+
+class ConversionCancelled(Exception):
+    """Raised when a Word conversion is cancelled through its cancel event"""
+
+
+def _check_cancel(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled()
+
+
+def _render_in_batches(
+    blocks: list,
+    render: Callable[[list], None],
+    progress: Callable[[int, int], None] | None,
+    cancel: threading.Event | None,
+) -> None:
+    """分批渲染正文块，每批之后报告 (已处理块数, 总块数) 并检查取消"""
+    total = len(blocks)
+    if progress is None and cancel is None:
+        render(blocks)
+        return
+    step = max(1, -(-total // PROGRESS_STEPS))
+    for start in range(0, total, step):
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled()
+        render(blocks[start:start + step])
+        if progress is not None:
+            progress(min(start + step, total), total)
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled()
+
+
+def _character_styles(settings: dict | None) -> bool:
+    """是否使用字符样式模式 (见 DEFAULT_SETTINGS["character_styles"])"""
+    return bool((settings or {}).get("character_styles", DEFAULT_SETTINGS["character_styles"]))
+
+
+def _stream_position(stream) -> int | None:
+    """可定位流的当前位置；socket 等不可定位的流返回 None"""
+    try:
+        return stream.tell() if stream.seekable() else None
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _output_size(output, start: int | None = 0) -> int | None:
+    """输出的字节数 (路径，或从 start 开始写入的二进制文件对象)"""
+    if isinstance(output, (str, os.PathLike)):
+        return os.path.getsize(output)
+    end = _stream_position(output)
+    return None if end is None or start is None else end - start
+
 
 class PureConverter:
-    def __init__(self, template_path: str | None = None):
+    def __init__(
+        self,
+        template_path: str | None = None,
+        template_cache: "TemplateCache | None" = None,
+        collect_stats: bool = True,
+        stats_callback: Callable[[str, float], None] | None = None,
+        parse_workers: int | None = 1,
+        parse_cache_size: int = PARSE_CACHE_SIZE,
+    ):
         """
         初始化转换器
         :param template_path: Word 模板路径 (.docx)
+        :param template_cache: 模板缓存，默认使用进程内共享缓存
+        :param collect_stats: 是否统计各阶段耗时与计数；关闭时不产生任何额外开销
+        :param stats_callback: 每个阶段结束时调用 callback(stage, seconds)
+        :param parse_workers: 超大输入 (PARALLEL_THRESHOLD 以上) 并行解析的进程数；1 为不并行，None 为 CPU 核数
+        :param parse_cache_size: 按文本缓存的解析结果条数；0 为不缓存 (批量转换互不相同的文件时)
         """
         self.template_path = template_path
-        # 初始化 markdown-it，启用 breaks=True 以支持软回车硬换行
-        self.md = MarkdownIt('commonmark', {'breaks': True})
+        self._template_cache = template_cache
+        # 初始化 markdown-it (breaks=True、GFM 表格)
+        self.md = create_parser()
+        self.parse_workers = parse_workers
+        # 文本 -> (文档模型, token 数)，按最近使用排序；字符串的哈希值缓存在对象上，同一文本对象再次查找是 O(1)
+        self.parse_cache_size = parse_cache_size
+        self._models: dict[str, tuple[DocumentModel, int | None]] = {}
+        self._models_lock = threading.Lock()
+        self.collect_stats = collect_stats
+        self.stats_callback = stats_callback
+        # 最近一次转换的统计信息
+        self.last_stats: ConversionStats = NULL_STATS
+
+    @property
+    def template_cache(self) -> "TemplateCache":
+        """模板缓存，未指定时为进程内共享缓存 (首次访问时导入 python-docx)"""
+        if self._template_cache is None:
+            from .template_cache import default_template_cache
+
+            self._template_cache = default_template_cache
+        return self._template_cache
 
     def set_template_path(self, path: str) -> None:
         """Set the Word template path
@@ -22,224 +134,329 @@ class PureConverter:
         """
         self.template_path = path
 
-    def convert_text(self, md_text: str, settings: dict = {}) -> str:
+    def warm_up(self, load_template: bool = True) -> None:
+        """
+        预热解析器与预览渲染 (可选: 模板缓存)，让第一次转换不必承担初始化开销
+        :param load_template: 是否同时加载模板 (会导入 python-docx)
+        """
+        self.convert_text(WARMUP_TEXT, stats=NULL_STATS)
+        if load_template:
+            self.template_cache.get(self.template_path)
+            self.template_cache.get_package(self.template_path)
+
+    def get_style_index(self) -> StyleIndex:
+        """
+        获取当前模板的样式索引 (模板加载时构建一次)
+        :return: StyleIndex，missing 列出模板中缺失、将使用回退方案的样式
+        """
+        return self.template_cache.get_styles(self.template_path)
+
+    def parse(
+        self, md_text: str, stats: ConversionStats = NULL_STATS, cancel: threading.Event | None = None
+    ) -> DocumentModel:
+        """
+        解析 Markdown，生成与渲染设置无关的中间文档模型
+        同一文本只解析一次：结果按文本缓存 (见 parse_cache_size)，只改设置时直接复用
+        超大输入且 parse_workers 不为 1 时，按顶层块切分后在进程池中并行解析
+        :param stats: 统计对象，记录解析耗时及 token、块、run 数量；命中缓存时记 parse_cache_hits
+        :param cancel: 置位后抛出 ConversionCancelled；较大的文本分段解析，段之间检查
+        """
+        with self._models_lock:
+            entry = self._models.pop(md_text, None)
+            if entry is not None:
+                self._models[md_text] = entry
+        if entry is None:
+            entry = self._parse(md_text, stats, cancel)
+            self._remember(md_text, entry)
+        elif stats.enabled:
+            stats.count("parse_cache_hits", 1)
+        return self._count_model(entry, stats)
+
+    def cache_model(self, md_text: str, model: DocumentModel) -> None:
+        """
+        登记在别处解析好的文本 (如增量预览拼接出的文档模型)，之后的 parse 直接复用
+        :param model: 必须与 parse(md_text) 的结果相同
+        """
+        self._remember(md_text, (model, None))
+
+    def _remember(self, md_text: str, entry: tuple[DocumentModel, int | None]) -> None:
+        if self.parse_cache_size <= 0:
+            return
+        with self._models_lock:
+            self._models.pop(md_text, None)
+            self._models[md_text] = entry
+            while len(self._models) > self.parse_cache_size:
+                del self._models[next(iter(self._models))]
+
+    def _parse(
+        self, md_text: str, stats: ConversionStats, cancel: threading.Event | None = None
+    ) -> tuple[DocumentModel, int]:
+        """不经缓存的解析，返回 (文档模型, token 数)"""
+        check_cancel = None if cancel is None else lambda: _check_cancel(cancel)
+        with stats.stage(PARSE):
+            if self.parse_workers != 1 and len(md_text) >= PARALLEL_THRESHOLD:
+                return parse_parallel(md_text, self.parse_workers, check_cancel=check_cancel)
+            if check_cancel is not None and len(md_text) > CANCELLABLE_PARSE_CHUNK:
+                # 整篇一次 parse 无法中途停止，可取消的转换在当前线程中分段解析
+                return parse_parallel(md_text, 1, CANCELLABLE_PARSE_CHUNK, check_cancel=check_cancel)
+            tokens = self.md.parse(md_text)
+            return DocumentModel.from_tokens(tokens), len(tokens)
+
+    @staticmethod
+    def _count_model(entry: tuple[DocumentModel, int | None], stats: ConversionStats) -> DocumentModel:
+        model, token_count = entry
+        if stats.enabled:
+            if token_count is not None:
+                stats.count("tokens", token_count)
+            stats.count("blocks", len(model.blocks))
+            stats.count("runs_before_merge", model.raw_run_count)
+            stats.count("runs_after_merge", model.run_count)
+        return model
+
+    def convert_text(self, md_text: str, settings: dict | None = None, stats: ConversionStats | None = None) -> str:
         """
         预览逻辑 (Convert to String)
+        :param stats: 统计对象，默认按 collect_stats 新建，结果见 last_stats
         """
+        stats = self._begin_stats(stats)
         if not md_text:
             return ""
-        if settings is None:
-            settings = {}
-
-        tokens = self.md.parse(md_text)
-        output_lines = []
-        list_context = []
-        list_counters = []
-        
-        ignore_bullets = settings.get("ignore_bullets", True)
-        ordered_style = settings.get("ordered_list_style", "text")
-
-        idx = 0
-        while idx < len(tokens):
-            token = tokens[idx]
-            
-            if token.type == 'bullet_list_open':
-                list_context.append('bullet')
-            elif token.type == 'ordered_list_open':
-                list_context.append('ordered')
-                start = token.attrs.get('start', 1) if token.attrs else 1
-                list_counters.append(start)
-            elif token.type in ['bullet_list_close', 'ordered_list_close']:
-                if list_context: list_context.pop()
-                if token.type == 'ordered_list_close' and list_counters: list_counters.pop()
-            
-            elif token.type == 'heading_open':
-                level = int(token.tag[1])
-                prefix = '#' * level + ' '
-                if idx + 1 < len(tokens) and tokens[idx+1].type == 'inline':
-                    output_lines.append(f"{prefix}{tokens[idx+1].content}")
-                    idx += 1 
-                output_lines.append("") 
-
-            elif token.type == 'inline':
-                content = token.content
-                line = content
-                
-                if list_context:
-                    current_type = list_context[-1]
-                    if current_type == 'bullet':
-                        if not ignore_bullets:
-                            line = f"• {content}"
-                    elif current_type == 'ordered':
-                        count = list_counters[-1]
-                        if ordered_style in ['text', 'list']:
-                            line = f"{count}. {content}"
-                        list_counters[-1] += 1
-
-                output_lines.append(line)
-                
-            elif token.type == 'paragraph_close':
-                if not list_context:
-                    output_lines.append("") 
-                
-            idx += 1
-
-        return "\n".join(output_lines).strip()
-
-    def convert_to_word(self, md_text: str, output_path: str, settings: dict) -> None:
+
+        model = self.parse(md_text, stats)
+        with stats.stage(RENDER):
+            text = "\n".join(TextRenderer(settings).render_lines(model.blocks)).strip()
+        stats.count("output_chars", len(text))
+        return text
+
+    def convert_to_word(
+        self,
+        md_text: str,
+        output_path: str,
+        settings: dict,
+        engine: str = "docx",
+        stats: ConversionStats | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+        save_profile: str = "export",
+    ) -> None:
         """
         导出 Word 文档
+        :param engine: "docx" 使用 python-docx (参考实现)；"ooxml" 直接写出 document.xml，适合超大文档
+        :param stats: 统计对象，默认按 collect_stats 新建，结果见 last_stats
+        :param progress: 渲染过程中调用 progress(已处理块数, 总块数)；解析完成时先报告一次 (0, 总块数)
+        :param cancel: 置位后中止转换并抛出 ConversionCancelled，不会留下不完整的输出文件
+        :param save_profile: "export" 完全压缩；"preview" 不压缩 (zip 条目直接存储)，适合只打开一次的临时预览文件
+        """
+        self._write_word(md_text, output_path, settings, engine, stats, progress, cancel, save_profile)
+
+    def convert_to_stream(
+        self,
+        md_text: str,
+        stream: IO[bytes],
+        settings: dict,
+        engine: str = "docx",
+        stats: ConversionStats | None = None,
+        save_profile: str = "export",
+    ) -> None:
+        """
+        将 Word 文档直接写入二进制文件对象 (BytesIO、socket.makefile('wb') 等)，不经过临时文件
+        :param stream: 可写的二进制文件对象，无需支持 seek；写完后不会关闭
+        :param engine: 见 convert_to_word
+        :param stats: 见 convert_to_word；不可定位的流不记录 output_bytes
+        :param save_profile: 见 convert_to_word
         """
-        if self.template_path and os.path.exists(self.template_path):
-            doc = Document(self.template_path)
-            # 清空模板内容，仅保留样式
-            for p in doc.paragraphs:
-                p._element.getparent().remove(p._element)
-            for t in doc.tables:
-                t._element.getparent().remove(t._element)
+        self._write_word(md_text, stream, settings, engine, stats, save_profile=save_profile)
+
+    def convert_to_bytes(
+        self,
+        md_text: str,
+        settings: dict,
+        engine: str = "docx",
+        stats: ConversionStats | None = None,
+        save_profile: str = "export",
+    ) -> bytes:
+        """
+        在内存中生成 Word 文档
+        :param engine: 见 convert_to_word
+        :param stats: 见 convert_to_word
+        :param save_profile: 见 convert_to_word
+        :return: .docx 文件内容
+        """
+        buffer = io.BytesIO()
+        self._write_word(md_text, buffer, settings, engine, stats, save_profile=save_profile)
+        return buffer.getvalue()
+
+    def convert_cached(
+        self,
+        md_text: str,
+        settings: dict,
+        cache: ResultCache,
+        engine: str = "docx",
+        stats: ConversionStats | None = None,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+        save_profile: str = "export",
+    ) -> Path:
+        """
+        通过结果缓存导出 Word 文档：文本、设置、模板及引用的本地图片文件均未变化时直接复用已生成的文件
+        :param cache: 结果缓存
+        :param engine: 见 convert_to_word
+        :param stats: 见 convert_to_word；命中缓存时只在文本含图片时解析 (用于确定图片文件)，不做其余转换
+        :param progress: 见 convert_to_word；命中缓存时不调用
+        :param cancel: 见 convert_to_word；取消时缓存中不会留下该条目
+        :param save_profile: 见 convert_to_word；两种配置的结果分别缓存
+        :return: 缓存中的 .docx 路径 (只读使用，导出时请复制)
+        """
+        stats = self._begin_stats(stats)
+        model = None
+        images = None
+        if "![" in md_text and (settings or {}).get("local_images", DEFAULT_SETTINGS["local_images"]):
+            # 图片文件的内容不在文本中，键里加上各文件的路径、修改时间和大小
+            model = self.parse(md_text, stats, cancel)
+            images = local_image_identities(
+                collect_image_sources(model.blocks),
+                (settings or {}).get("image_base_dir", DEFAULT_SETTINGS["image_base_dir"]),
+            )
+        key = result_key(
+            md_text, settings, self.template_cache.identity(self.template_path), engine, save_profile, images
+        )
+        return cache.get_or_create(
+            key,
+            lambda path: self._write_word(
+                md_text, path, settings, engine, stats, progress, cancel, save_profile, model
+            ),
+        )
+
+    def _write_word(
+        self,
+        md_text: str,
+        output: "str | os.PathLike | IO[bytes]",
+        settings: dict,
+        engine: str,
+        stats: ConversionStats | None,
+        progress: Callable[[int, int], None] | None = None,
+        cancel: threading.Event | None = None,
+        save_profile: str = "export",
+        model: DocumentModel | None = None,
+    ) -> None:
+        """convert_to_word / convert_to_stream / convert_to_bytes 的共同实现 (model 为已解析好的文档模型)"""
+        stats = self._begin_stats(stats)
+        start = None if isinstance(output, (str, os.PathLike)) else _stream_position(output)
+        _check_cancel(cancel)
+        if model is None:
+            model = self.parse(md_text, stats, cancel)
+        _check_cancel(cancel)
+        if progress is not None:
+            progress(0, len(model.blocks))
+
+        if engine == "ooxml":
+            from .ooxml_writer import OoxmlWriter
+
+            with stats.stage(TEMPLATE):
+                package = self.template_cache.get_package(self.template_path, _character_styles(settings))
+                writer = OoxmlWriter(package, output, settings, save_profile)
+            try:
+                with stats.stage(RENDER):
+                    _render_in_batches(model.blocks, writer.write, progress, cancel)
+                with stats.stage(SAVE):
+                    writer.close()
+            except BaseException:
+                writer.abort()
+                if isinstance(output, (str, os.PathLike)) and os.path.exists(output):
+                    os.unlink(output)
+                raise
         else:
-            doc = Document()
-
-        tokens = self.md.parse(md_text)
-        # for token in tokens:
-        #     print(token, end='\n\n')
-        self._render_tokens(doc, tokens, settings)
-        doc.save(output_path)
-
-    def _render_tokens(self, doc: DocumentObject, tokens, settings):
-        """核心渲染逻辑"""
-        ignore_bullets = settings.get("ignore_bullets", False)
-        ordered_style = settings.get("ordered_list_style", "text")
-
-        idx = 0
-        list_stack = []
-        ordered_counters = []
-
-        while idx < len(tokens):
-            token = tokens[idx]
-
-            # === 1. 列表状态维护 ===
-            if token.type == 'bullet_list_open':
-                list_stack.append('bullet')
-            elif token.type == 'ordered_list_open':
-                list_stack.append('ordered')
-                start = token.attrs.get('start', 1) if token.attrs else 1
-                ordered_counters.append(start)
-            elif token.type in ['bullet_list_close', 'ordered_list_close']:
-                if list_stack: list_stack.pop()
-                if token.type == 'ordered_list_close' and ordered_counters: ordered_counters.pop()
-
-            # === 2. 标题处理 ===
-            elif token.type == 'heading_open':
-                level = int(token.tag[1])
-                if idx + 1 < len(tokens) and tokens[idx+1].type == 'inline':
-                    # 标题通常不分行，直接由样式控制
-                    p = doc.add_heading('', level=level)
-                    self._fill_rich_text(doc, p, tokens[idx+1])
-                    idx += 1
-
-            # === 3. 正文/列表项处理 ===
-            elif token.type == 'inline':
-                parent_type = tokens[idx-1].type
-                if parent_type == 'paragraph_open':
-                    # 准备前缀和样式
-                    p_style = None
-                    prefix = ""
-                    use_manual_number = False # 标记是否需要手动添加数字
-
-                    if list_stack:
-                        curr = list_stack[-1]
-                        if curr == 'bullet' and not ignore_bullets:
-                            prefix = "• "
-                        elif curr == 'ordered':
-                            if ordered_style == 'list':
-                                # 尝试使用 Word 原生样式
-                                p_style = 'List'
-                            elif ordered_style == 'text':
-                                use_manual_number = True
-                            # 'none' 什么都不做
-
-                    # === 创建第一段 ===
-                    p = doc.add_paragraph()
-                    # try p_style
-                    try:
-                        p.style = p_style
-                    except (KeyError, ValueError):
-                        # 如果模板里没有 'List Number'，回退到普通样式
-                        # 并且强制开启手动数字模式
-                        if ordered_style == 'list':
-                            use_manual_number = True
-
-                    # 统一处理有序列表计数器
-                    if list_stack and list_stack[-1] == 'ordered':
-                        if use_manual_number:
-                            prefix = f"{ordered_counters[-1]}. "
-                        ordered_counters[-1] += 1 # 计数增加
-                    
-                    # 写入前缀
-                    if prefix:
-                        p.add_run(prefix)
-
-                    # === 核心：渲染富文本并处理换行 (解决问题1) ===
-                    # 传入 doc，允许函数内部创建新段落
-                    self._fill_rich_text(doc, p, token, style=None) 
-                    # 注意：style=None 表示换行后的段落使用默认样式(Normal)
-                    # 这样避免换行后的第二行也带上列表编号
-            
-            idx += 1
-
-    def _fill_rich_text(self, doc:DocumentObject, paragraph, inline_token, style=None):
-        """
-        同时支持 softbreak 和 hardbreak，确保 breaks=True 时换行生效。
-        """
-        if not inline_token.children:
-            # 处理纯文本 Token (无 children 结构)
-            self._add_text_with_breaks(doc, paragraph, inline_token.content, style)
-            return
+            from .template_cache import save_document
+            from .word_renderer import WordRenderer
+
+            # 从缓存获取已清空正文的模板副本
+            with stats.stage(TEMPLATE):
+                doc = self.template_cache.get(self.template_path, _character_styles(settings))
+                styles = self.template_cache.get_styles(self.template_path, _character_styles(settings))
+            with stats.stage(RENDER):
+                _render_in_batches(model.blocks, WordRenderer(doc, settings, styles).render, progress, cancel)
+            # 保存是最后一步，此后不再响应取消
+            with stats.stage(SAVE):
+                save_document(doc, output, save_profile)
+
+        if stats.enabled:
+            size = _output_size(output, start)
+            if size is not None:
+                stats.count("output_bytes", size)
+
+    def convert_stream_to_word(
+        self,
+        source,
+        output_path,
+        settings: dict,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        engine: str = "docx",
+        stats: ConversionStats | None = None,
+        save_profile: str = "export",
+    ) -> None:
+        """
+        流式导出 Word 文档 (适用于超大输入，峰值内存与输入大小无关)
+        :param source: Markdown 文件路径、文本文件对象或字符串迭代器
+        :param output_path: 输出路径或二进制文件对象
+        :param chunk_size: 每段的目标字符数，段落只在顶层块边界切分
+        :param engine: "docx" 或 "ooxml"，见 convert_to_word
+        :param stats: 统计对象，各段的耗时和计数累加在一起
+        :param save_profile: 见 convert_to_word
+        """
+        stats = self._begin_stats(stats)
+        start = None if isinstance(output_path, (str, os.PathLike)) else _stream_position(output_path)
+        chunks = iter_block_chunks(iter_lines(source), chunk_size)
+        if engine == "ooxml":
+            from .ooxml_writer import OoxmlWriter
+
+            with stats.stage(TEMPLATE):
+                package = self.template_cache.get_package(self.template_path, _character_styles(settings))
+                writer = OoxmlWriter(package, output_path, settings, save_profile)
+
+            def render(blocks):
+                with stats.stage(RENDER):
+                    writer.write(blocks)
+        else:
+            from .word_renderer import WordRenderer
+
+            with stats.stage(TEMPLATE):
+                doc = self.template_cache.get(self.template_path, _character_styles(settings))
+                styles = self.template_cache.get_styles(self.template_path, _character_styles(settings))
+                renderer = WordRenderer(doc, settings, styles)
+                writer = StreamingDocxWriter(doc, output_path, save_profile)
+
+            def render(blocks):
+                with stats.stage(RENDER):
+                    renderer.render(blocks)
+                with stats.stage(SAVE):
+                    writer.flush()
+
+        try:
+            for chunk in chunks:
+                # 分段不进入解析缓存
+                render(self._count_model(self._parse(chunk, stats), stats).blocks)
+        except BaseException:
+            writer.abort()
+            if isinstance(output_path, (str, os.PathLike)) and os.path.exists(output_path):
+                os.unlink(output_path)
+            raise
+        with stats.stage(SAVE):
+            writer.close()
+
+        if stats.enabled:
+            size = _output_size(output_path, start)
+            if size is not None:
+                stats.count("output_bytes", size)
+
+    def _begin_stats(self, stats: ConversionStats | None) -> ConversionStats:
+        """确定本次转换使用的统计对象并记为 last_stats"""
+        if stats is None:
+            stats = ConversionStats(self.stats_callback) if self.collect_stats else NULL_STATS
+        self.last_stats = stats
+        return stats
+
+    def _render_tokens(self, doc: "DocumentObject", tokens, settings: dict | None = None) -> None:
+        """核心渲染逻辑: token 流 -> 中间文档模型 -> python-docx"""
+        from .word_renderer import WordRenderer
 
-        curr_p = paragraph
-        curr_bold = False
-        curr_italic = False
-
-        for child in inline_token.children:
-            if child.type == 'strong_open':
-                curr_bold = True
-            elif child.type == 'strong_close':
-                curr_bold = False
-            elif child.type == 'em_open':
-                curr_italic = True
-            elif child.type == 'em_close':
-                curr_italic = False
-            
-            # process '\n' '\n\r'
-            elif child.type == 'softbreak' or child.type == 'hardbreak':
-                # start new paragraph
-                curr_p = doc.add_paragraph(style=style)
-            
-            # process text content
-            elif child.type == 'text' or child.type == 'code_inline':
-                # some contents also include '\n'
-                parts = child.content.split('\n')
-                for i, part in enumerate(parts):
-                    if i > 0:
-                        # when meet '\n', start a new line
-                        curr_p = doc.add_paragraph(style=style)
-                    
-                    if part:
-                        run = curr_p.add_run(part)
-                        # apply the font settings
-                        run.bold = curr_bold
-                        run.italic = curr_italic
-                        # process codes
-                        if child.type == 'code_inline':
-                            run.font.name = 'Courier New'
-
-    def _add_text_with_breaks(self, doc:DocumentObject, paragraph, text, style=None):
-        """处理无 children 的纯文本换行"""
-        lines = text.split('\n')
-        curr_p = paragraph
-        for i, line in enumerate(lines):
-            if i > 0:
-                curr_p = doc.add_paragraph(style=style)
-            if line:
-                curr_p.add_run(line)
\ No newline at end of file
+        WordRenderer(doc, settings).render(DocumentModel.from_tokens(tokens).blocks)
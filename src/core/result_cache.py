@@ -0,0 +1,187 @@
+"""Content-addressed conversion result cache
+
+以 (Markdown 文本, 转换设置, 模板标识, 后端, 引用的本地图片文件) 的 sha256 为键，
+把生成的 .docx 保存在缓存目录中。这些都没变时，预览直接打开已有文件，导出只需复制，
+无需重新转换。缓存总大小有上限，超出时按最近使用时间 (mtime) 淘汰最旧的文件。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+# 输出格式变化时递增，使旧缓存失效
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 256 << 20
+# 超过该时间 (秒) 的临时文件视为被中断的转换遗留，淘汰时删除
+STALE_TEMP_SECONDS = 24 * 3600
+
+_SUFFIX = ".docx"
+
+
+def result_key(
+    md_text: str,
+    settings: dict | None,
+    template_identity: tuple,
+    engine: str = "docx",
+    save_profile: str = "export",
+    images: list[tuple] | None = None,
+) -> str:
+    """Build the cache key of a conversion
+
+    Args:
+        md_text: Markdown text
+        settings: Converter settings
+        template_identity: Template identity from TemplateCache.identity
+        engine: Word backend
+        save_profile: Zip save profile ("export" or "preview")
+        images: Local image files the text references, from images.local_image_identities;
+            replacing an image file changes the key
+
+    Returns:
+        Hex sha256 digest
+    """
+    meta = json.dumps(
+        [CACHE_VERSION, engine, save_profile, settings or {}, list(template_identity), images or []],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    h = hashlib.sha256(meta.encode("utf-8"))
+    h.update(b"\0")
+    h.update(md_text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of generated .docx files in a directory"""
+
+    def __init__(self, directory: "str | os.PathLike", max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize result cache
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Maximum total size of cached files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        """Get the file path of a cache entry (which may not exist)"""
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def get(self, key: str) -> Path | None:
+        """Get a cached file and mark it as recently used
+
+        Returns:
+            Path of the cached .docx, or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def get_or_create(self, key: str, write: Callable[[str], None]) -> Path:
+        """Get a cached file, producing it with ``write(path)`` on a miss
+
+        The file is written under a temporary name and renamed into place, so a
+        failed or concurrent conversion never leaves a partial entry behind.
+
+        Args:
+            key: Cache key from result_key
+            write: Callable that writes the .docx to the given path
+
+        Returns:
+            Path of the cached .docx
+        """
+        path = self.get(key)
+        if path is not None:
+            return path
+
+        path = self.path_for(key)
+        fd, tmp = tempfile.mkstemp(prefix=f".{key[:16]}-", suffix=_SUFFIX, dir=self.directory)
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            # 转换失败时删除临时文件 (成功时已被重命名)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path | None = None) -> None:
+        """Remove the least recently used files until the total size fits max_bytes
+
+        Temporary files left by conversions that were killed are removed once they are
+        older than STALE_TEMP_SECONDS (younger ones may still be being written).
+        """
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(_SUFFIX):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    if entry.name.startswith("."):
+                        if st.st_mtime < stale_before:
+                            try:
+                                os.unlink(entry.path)
+                            except OSError:
+                                pass
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    # 其他进程可能同时删除了该文件
+                    if keep is not None and os.path.samefile(path, keep):
+                        continue
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        """Remove all cached files and reset counters"""
+        with self._lock:
+            for path in self.directory.glob(f"*{_SUFFIX}"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        """Get cache hit/miss counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,110 @@
+"""Conversion instrumentation
+
+记录一次转换中各阶段 (模板加载、解析、渲染、保存) 的耗时，以及 token、块 (blocks)、run、
+输出字节数等计数。关闭统计时使用 NULL_STATS：所有方法都是空操作，stage() 返回
+共享的空上下文管理器，不调用计时函数、不分配对象。
+"""
+
+import time
+from contextlib import nullcontext
+from typing import Callable
+
+# 阶段名称
+TEMPLATE = "template"
+PARSE = "parse"
+RENDER = "render"
+SAVE = "save"
+
+
+class _Stage:
+    """Context manager timing one stage"""
+
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats: "ConversionStats", name: str):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stats.add_time(self.name, time.perf_counter() - self.start)
+
+
+class ConversionStats:
+    """Per-stage wall time and counters of one (or several aggregated) conversions
+
+    Attributes:
+        timings: Stage name -> accumulated seconds
+        counters: Counter name -> accumulated value (tokens, blocks, runs, output_bytes ...)
+        callback: Optional hook called as callback(stage, seconds) whenever a stage finishes
+    """
+
+    __slots__ = ("timings", "counters", "callback")
+
+    enabled = True
+
+    def __init__(self, callback: Callable[[str, float], None] | None = None):
+        self.timings: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.callback = callback
+
+    def stage(self, name: str) -> _Stage:
+        """Time a stage: ``with stats.stage(PARSE): ...``"""
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add wall time to a stage and notify the callback"""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def get(self, name: str, default=0):
+        """Get a counter or, failing that, a stage time"""
+        if name in self.counters:
+            return self.counters[name]
+        return self.timings.get(name, default)
+
+    @property
+    def total_time(self) -> float:
+        """Sum of all stage times"""
+        return sum(self.timings.values())
+
+    def as_dict(self) -> dict:
+        """JSON-serializable snapshot"""
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+    def __repr__(self) -> str:
+        timings = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in self.timings.items())
+        counters = ", ".join(f"{k}={v}" for k, v in self.counters.items())
+        return f"ConversionStats({timings}; {counters})"
+
+
+_NULL_STAGE = nullcontext()
+
+
+class _NullStats(ConversionStats):
+    """Disabled statistics: every method is a no-op"""
+
+    __slots__ = ()
+
+    enabled = False
+
+    def stage(self, name: str) -> nullcontext:
+        return _NULL_STAGE
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+
+# 关闭统计时共享的空实现
+NULL_STATS = _NullStats()
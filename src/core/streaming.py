@@ -0,0 +1,355 @@
+"""Streaming conversion for very large Markdown inputs
+
+输入按顶层块对齐切分成若干段，逐段 parse、渲染，渲染出的段落立即序列化写入
+word/document.xml 的 zip 流并从文档树中移除，因此峰值内存只与单段大小有关，
+与输入总大小无关。
+"""
+
+import io
+import os
+import re
+import zipfile
+from typing import IO, TYPE_CHECKING, Iterable, Iterator
+
+# markdown-it 自身的 HTML 块规则 (CommonMark 类型 1-7): (起始, 结束, 能否打断段落)
+from markdown_it.rules_block.html_block import HTML_SEQUENCES
+
+from ..utils.text_loader import open_text
+
+if TYPE_CHECKING:
+    from docx.document import Document as DocumentObject
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_LIST_MARKER = re.compile(r"^(?:[-+*]|\d{1,9}[.)])(?:[ \t]|$)")
+_XMLNS = re.compile(rb' xmlns:(\w+)="([^"]*)"')
+_ATX_HEADING = re.compile(r"^#{1,6}(?:[ \t]|$)")
+_THEMATIC_BREAK = re.compile(r"^([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^(?:=+|-+)[ \t]*$")
+_REFERENCE_DEF = re.compile(r"^\[[^\]]+\]:")
+
+
+def iter_lines(source: "str | os.PathLike | IO[str] | Iterable[str]") -> Iterator[str]:
+    """Iterate over lines (without line endings) from a path, text file or string iterator
+
+    The iterator may yield arbitrary fragments; they are re-split on newlines. Paths are
+    decoded with the encoding detected by text_loader.open_text. Like str.split("\n"),
+    the last line is yielded even when empty, so a text that ends with a newline ends
+    with an empty line and the lines join back to the text.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        # 与导入文件相同，按文件开头的样本判断编码
+        with open_text(source) as f:
+            yield from iter_lines(f)
+        return
+
+    pending = ""
+    for fragment in source:
+        if pending:
+            fragment = pending + fragment
+        lines = fragment.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith("\r") else line
+    yield pending
+
+
+def _indent(line: str) -> int:
+    """Columns of leading whitespace (tabs advance to the next multiple of 4, as in markdown-it)"""
+    width = 0
+    for ch in line:
+        if ch == " ":
+            width += 1
+        elif ch == "\t":
+            width += 4 - width % 4
+        else:
+            break
+    return width
+
+
+def _fence_marker(text: str) -> str | None:
+    """Marker of a fence opening line (leading whitespace already stripped), else None"""
+    m = _FENCE.match(text)
+    # 反引号围栏的信息串中不能再有反引号
+    if m is None or m.group(1)[0] == "`" and "`" in text[m.end():]:
+        return None
+    return m.group(1)
+
+
+def _quote_content(text: str) -> str:
+    """Content of a block quote line: without the ">" marker and one following space"""
+    return text[2:] if text[1:2] == " " else text[1:]
+
+
+class _BlockScanner:
+    """Tracks just enough block structure to tell whether a line is inside a fence or HTML block
+
+    Follows markdown-it's rules for what matters at chunk boundaries: fenced code blocks,
+    HTML blocks (types 1-5 run to their end marker and may contain blank lines, types
+    6-7 run to the next blank line, type 7 cannot interrupt a paragraph), list items
+    (a less indented line closes them, together with a fence or HTML block inside),
+    block quotes (their content is tracked by a nested scanner) and paragraphs (lazy
+    continuation lines do not start blocks).
+    """
+
+    __slots__ = ("items", "paragraph", "fence", "fence_col", "html_end", "html_col", "quote")
+
+    def __init__(self):
+        # 未结束的列表项的内容列 (由外到内)
+        self.items: list[int] = []
+        # 未结束段落所在容器的内容列，没有段落时为 None
+        self.paragraph: int | None = None
+        self.fence: str | None = None
+        self.fence_col = 0
+        self.html_end: "re.Pattern[str] | None" = None
+        self.html_col = 0
+        # 未结束的引用块的内容 (位于全部 items 之内)
+        self.quote: _BlockScanner | None = None
+
+    @property
+    def in_block(self) -> bool:
+        """Whether a fenced code block or HTML block is open"""
+        return self.fence is not None or self.html_end is not None
+
+    @property
+    def lazy(self) -> bool:
+        """Whether the innermost open block is a paragraph, which lazy continuation lines extend"""
+        if self.quote is not None:
+            return self.quote.lazy
+        return self.paragraph is not None
+
+    def feed(self, line: str) -> None:
+        """Advance the state past one line"""
+        # markdown-it 只跳过空格和制表符；只含空白的行是空行
+        text = line.lstrip(" \t")
+        indent = _indent(line)
+        if not text:
+            # 类型 6/7 的结束标记 "^$" 匹配空行
+            if self.html_end is not None and self.html_end.search(text):
+                self.html_end = None
+            # 空行结束引用块
+            self.paragraph = None
+            self.quote = None
+            return
+        if self.fence is not None:
+            if indent >= self.fence_col:
+                marker = _FENCE.match(text)
+                if (marker is not None and indent - self.fence_col < 4 and marker.group(1)[0] == self.fence[0]
+                        and len(marker.group(1)) >= len(self.fence) and not text[marker.end():].strip()):
+                    self.fence = None
+                return
+            # 缩进不足的行结束列表项，项中的围栏随之结束
+            self.fence = None
+        if self.html_end is not None:
+            if indent >= self.html_col:
+                if self.html_end.search(text):
+                    self.html_end = None
+                return
+            self.html_end = None
+        self._block(text, indent)
+
+    def _interrupts(self, text: str, rel: int, restricted: bool) -> bool:
+        """Whether a line starts a block that can interrupt a paragraph
+
+        Args:
+            rel: Indentation relative to the line's container
+            restricted: Whether list items follow the stricter rules for interrupting a
+                paragraph of the same container (ordered lists must start at 1, no empty items)
+        """
+        if rel >= 4:
+            return False
+        if _fence_marker(text) or text[0] == ">" or _THEMATIC_BREAK.match(text) or _ATX_HEADING.match(text):
+            return True
+        if text[0] == "<":
+            for start, _, interrupts in HTML_SEQUENCES:
+                if start.search(text):
+                    return interrupts
+        m = _LIST_MARKER.match(text)
+        if m is None:
+            return False
+        if not restricted:
+            return True
+        marker = m.group(0).rstrip()
+        return bool(text[m.end():].strip()) and (not marker[0].isdigit() or marker[:-1] == "1")
+
+    def _block(self, text: str, indent: int) -> None:
+        """Handle a line outside fences and HTML blocks"""
+        items = self.items
+        depth = 0
+        while depth < len(items) and items[depth] <= indent:
+            depth += 1
+        base = items[depth - 1] if depth else 0
+        rel = indent - base
+
+        quote = self.quote
+        if quote is not None:
+            if depth == len(items) and rel < 4 and text[0] == ">":
+                quote.feed(_quote_content(text))
+                return
+            # 引用块只能被惰性续行延续，其中的段落同样不会变成 setext 标题
+            if quote.lazy and not self._interrupts(text, rel, False):
+                return
+        elif self.paragraph is not None:
+            if not self._interrupts(text, rel, indent >= self.paragraph):
+                # 段落续行 (包括惰性续行，不结束列表项)；同一容器中的 setext 下划线结束段落
+                if indent >= self.paragraph and indent - self.paragraph < 4 and _SETEXT_UNDERLINE.match(text):
+                    self.paragraph = None
+                return
+        del items[depth:]
+        self.paragraph = None
+        self.quote = None
+
+        if rel >= 4:
+            # 缩进代码块
+            return
+        marker = _fence_marker(text)
+        if marker is not None:
+            self.fence = marker
+            self.fence_col = base
+            return
+        if text[0] == "<":
+            for start, end, _ in HTML_SEQUENCES:
+                if start.search(text):
+                    # 类型 1-5 的结束标记可能与起始标记在同一行
+                    if not end.search(text):
+                        self.html_end = end
+                        self.html_col = base
+                    return
+        if text[0] == ">":
+            self.quote = _BlockScanner()
+            self.quote.feed(_quote_content(text))
+            return
+        if _THEMATIC_BREAK.match(text) or _ATX_HEADING.match(text) or _REFERENCE_DEF.match(text):
+            # 标题、分隔线与链接引用定义之后没有可延续的段落
+            return
+        m = _LIST_MARKER.match(text)
+        if m is not None:
+            width = len(m.group(0).rstrip(" \t"))
+            rest = text[width:]
+            content = rest.lstrip(" \t")
+            spaces = _indent(rest)
+            # 内容列：标记后 1-4 个空格；空项或超过 4 个空格 (缩进代码) 时按 1 个计
+            col = indent + width + (spaces if content and spaces <= 4 else 1)
+            items.append(col)
+            if content:
+                self._block(content, indent + width + spaces)
+            return
+        self.paragraph = base
+
+
+def iter_block_chunks(lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Group lines into chunks of roughly chunk_size characters, cut only at top-level block boundaries
+
+    A cut is made before a non-indented line that follows a blank line, is not a list
+    marker (which could continue the previous list) and is not inside a fenced code block
+    or an HTML block (see _BlockScanner). Lists therefore never span two chunks.
+
+    lines are split like iter_lines, so the chunks concatenate back to the text: the last
+    chunk gets no extra newline (markdown-it drops a whitespace-only last line only when
+    no newline follows it).
+    """
+    buf: list[str] = []
+    size = 0
+    prev_blank = False
+    scanner = _BlockScanner()
+
+    for line in lines:
+        if (size >= chunk_size and prev_blank and not scanner.in_block and line
+                and not line[0].isspace() and not _LIST_MARKER.match(line)):
+            yield "\n".join(buf) + "\n"
+            buf = []
+            size = 0
+
+        buf.append(line)
+        size += len(line) + 1
+        prev_blank = not line.strip(" \t")
+        scanner.feed(line)
+
+    if buf:
+        yield "\n".join(buf)
+
+
+class StreamingDocxWriter:
+    """Writes word/document.xml incrementally while the document body is rendered chunk by chunk
+
+    Usage: render a chunk into ``doc``, call ``flush()`` to move the rendered body
+    elements into the zip stream, repeat, then ``close()``.
+    """
+
+    def __init__(
+        self,
+        doc: "DocumentObject",
+        output: "str | os.PathLike | IO[bytes]",
+        save_profile: str = "export",
+    ):
+        """Initialize writer
+
+        Args:
+            doc: Stripped template document (its body must only contain sectPr)
+            output: Output path or binary file object
+            save_profile: "export" (deflate) or "preview" (stored zip entries)
+        """
+        # 只有写 docx 时才需要 lxml / python-docx，切分函数保持轻量 (并行解析也会导入本模块)
+        from lxml import etree
+
+        from .template_cache import DOCUMENT_PART, split_document_xml, zip_compression
+
+        self._tostring = etree.tostring
+        self.doc = doc
+        self.body = doc.element.body
+        self._save_profile = save_profile
+        self._compression = zip_compression(save_profile)
+        self._zip = zipfile.ZipFile(output, "w", compression=self._compression)
+
+        xml = etree.tostring(doc.element, xml_declaration=True, encoding="UTF-8", standalone=True)
+        head, self._tail = split_document_xml(xml)
+        # 根元素已声明的命名空间，序列化子元素时去掉重复声明
+        root_tag = xml[:xml.index(b">", xml.index(b"<w:document")) + 1]
+        self._declared = set(_XMLNS.findall(root_tag))
+
+        self._stream = self._zip.open(DOCUMENT_PART, "w", force_zip64=True)
+        self._stream.write(head)
+        self.bytes_written = len(head)
+
+    def _strip_ns(self, match: "re.Match[bytes]") -> bytes:
+        """Drop an xmlns declaration that the document root already declares"""
+        return b"" if (match.group(1), match.group(2)) in self._declared else match.group(0)
+
+    def flush(self) -> None:
+        """Serialize all rendered body elements (except sectPr) and drop them from the tree"""
+        sect_pr = self.body.sectPr
+        for child in list(self.body):
+            if child is sect_pr:
+                continue
+            data = self._tostring(child, encoding="UTF-8")
+            end = data.index(b">")
+            data = _XMLNS.sub(self._strip_ns, data[:end]) + data[end:]
+            self._stream.write(data)
+            self.bytes_written += len(data)
+            self.body.remove(child)
+
+    def close(self) -> None:
+        """Finish document.xml and copy every other package part from the (empty-bodied) document"""
+        from .template_cache import DOCUMENT_PART, save_document
+
+        self.flush()
+        self._stream.write(self._tail)
+        self._stream.close()
+
+        # 渲染过程中可能新增了关系或部件，因此在最后再保存一次空正文的文档以获取其余部件
+        buf = io.BytesIO()
+        save_document(self.doc, buf, self._save_profile)
+        with zipfile.ZipFile(buf) as z_in:
+            for info in z_in.infolist():
+                if info.filename == DOCUMENT_PART:
+                    continue
+                self._zip.writestr(info.filename, z_in.read(info.filename), compress_type=self._compression)
+        self._zip.close()
+
+    def abort(self) -> None:
+        """Close the underlying zip without finishing the document"""
+        try:
+            self._stream.close()
+        finally:
+            self._zip.close()
@@ -0,0 +1,113 @@
+"""Per-template style resolution index
+
+模板加载时只解析一次 styles.xml，记录渲染需要的标题、列表、代码及字符样式是否存在
+及其 styleId (本地化模板中 styleId 往往是 "13"、"a" 之类)。渲染时直接使用预先解析好的
+ID 和回退方案，不再对每个段落做样式查找和 try/except。
+"""
+
+import zipfile
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+STYLES_PART = "word/styles.xml"
+
+HEADING_LEVELS = range(1, 10)
+LIST_STYLE = "List"
+TABLE_STYLE = "Table Grid"
+# 字符样式模式 (settings["character_styles"]) 中加粗、斜体使用的样式
+STRONG_STYLE = "Strong"
+EMPHASIS_STYLE = "Emphasis"
+INLINE_CODE_STYLE = "Inline Code"
+# 代码样式候选 (按优先级)，pandoc / Word 内置模板中常见的名称
+CODE_CHAR_STYLES = (INLINE_CODE_STYLE, "Verbatim Char", "HTML Code")
+CODE_PARAGRAPH_STYLES = ("Source Code", "HTML Preformatted")
+
+
+class StyleIndex:
+    """Resolved style IDs and fallback plan for one template"""
+
+    __slots__ = (
+        "style_ids",
+        "heading_ids",
+        "list_id",
+        "strong_id",
+        "emphasis_id",
+        "code_char_id",
+        "code_paragraph_id",
+        "table_id",
+        "missing",
+    )
+
+    def __init__(self, styles_element=None):
+        """Build the index from a w:styles element
+
+        Args:
+            styles_element: Parsed w:styles root (lxml element), or None for a template without styles
+        """
+        # (style type, lower-cased style name) -> styleId
+        self.style_ids: dict[tuple[str, str], str] = {}
+        if styles_element is not None:
+            for style in styles_element.iter(f"{_W}style"):
+                name = style.find(f"{_W}name")
+                if name is None:
+                    continue
+                key = (style.get(f"{_W}type", "paragraph"), name.get(f"{_W}val", "").lower())
+                self.style_ids.setdefault(key, style.get(f"{_W}styleId"))
+
+        self.heading_ids = {level: self.style_id(f"Heading {level}") for level in HEADING_LEVELS}
+        self.list_id = self.style_id(LIST_STYLE)
+        self.strong_id = self.style_id(STRONG_STYLE, "character")
+        self.emphasis_id = self.style_id(EMPHASIS_STYLE, "character")
+        self.code_char_id = self._first(CODE_CHAR_STYLES, "character")
+        self.code_paragraph_id = self._first(CODE_PARAGRAPH_STYLES, "paragraph")
+        # 没有表格样式时表格直接设置边框
+        self.table_id = self.style_id(TABLE_STYLE, "table")
+
+        # 缺失的样式 (用于提示)；标题缺失时回退为正文样式，List 缺失时回退为手动编号
+        self.missing = [f"Heading {level}" for level, sid in self.heading_ids.items() if sid is None]
+        if self.list_id is None:
+            self.missing.append(LIST_STYLE)
+
+    def style_id(self, name: str, style_type: str = "paragraph") -> str | None:
+        """Look up a style ID by its UI name (case-insensitive), or None if the template lacks it"""
+        return self.style_ids.get((style_type, name.lower()))
+
+    def _first(self, names: tuple[str, ...], style_type: str) -> str | None:
+        """Get the ID of the first style in names that exists"""
+        for name in names:
+            style_id = self.style_id(name, style_type)
+            if style_id is not None:
+                return style_id
+        return None
+
+    @property
+    def missing_character_styles(self) -> list[str]:
+        """Character styles used by character style mode that the template lacks"""
+        resolved = {
+            STRONG_STYLE: self.strong_id,
+            EMPHASIS_STYLE: self.emphasis_id,
+            INLINE_CODE_STYLE: self.code_char_id,
+        }
+        return [name for name, style_id in resolved.items() if style_id is None]
+
+    @property
+    def manual_numbering(self) -> bool:
+        """Whether 'list' ordered style must fall back to manual "1. " prefixes"""
+        return self.list_id is None
+
+
+def read_template_styles(template_path: str) -> StyleIndex:
+    """Build the style index straight from a .docx file's styles part
+
+    Only lxml is needed, not python-docx, so the UI can show missing styles at startup cheaply.
+
+    Args:
+        template_path: Path to template file (.docx)
+    """
+    from lxml import etree
+
+    with zipfile.ZipFile(template_path) as z:
+        try:
+            data = z.read(STYLES_PART)
+        except KeyError:
+            return StyleIndex()
+    return StyleIndex(etree.fromstring(data))
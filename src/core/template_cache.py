@@ -0,0 +1,330 @@
+"""Word template cache
+
+模板文件在多次转换之间保持不变，没必要每次都重新解压、解析并逐个删除正文元素。
+缓存以 (路径, mtime, size) 为键，只保存一份已清空正文的模板包 (Package)，每次转换
+拿到一份独立的深拷贝。
+
+注意: 缓存的是 Package 而不是 Document。lxml 元素的 __deepcopy__ 不参与 memo，
+Document 上缓存的 _Body 等代理对象持有的子元素会被复制成脱离文档树的孤立副本。
+"""
+
+import copy
+import os
+import re
+import threading
+import zipfile
+
+from docx import Document
+from docx.api import _default_docx_path
+from docx.document import Document as DocumentObject
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.package import OpcPackage
+from docx.opc.pkgwriter import PackageWriter
+from lxml import etree
+
+from .ooxml_fragments import CODE_FONT, section_text_width
+from .style_index import EMPHASIS_STYLE, INLINE_CODE_STYLE, STRONG_STYLE, STYLES_PART, StyleIndex
+
+DOCUMENT_PART = "word/document.xml"
+
+# 字符样式模式下模板缺少时新建的样式: (名称, 是否 Word 内置样式, uiPriority)
+_CHARACTER_STYLES = (
+    (STRONG_STYLE, True, 22),
+    (EMPHASIS_STYLE, True, 20),
+    (INLINE_CODE_STYLE, False, 99),
+)
+
+# 保存配置 -> zip 压缩方式。"preview": 只会被打开一次的临时预览文件，不压缩 (模板部件原样写入)；
+# "export": 导出给用户的文件，完全压缩
+PREVIEW = "preview"
+EXPORT = "export"
+SAVE_PROFILES = {PREVIEW: zipfile.ZIP_STORED, EXPORT: zipfile.ZIP_DEFLATED}
+
+_BODY_OPEN = re.compile(rb"<w:body[^>]*>")
+
+
+def split_document_xml(xml: bytes) -> tuple[bytes, bytes]:
+    """Split a serialized document.xml with an emptied body into (head, tail)
+
+    head ends right after the <w:body> start tag; tail starts with whatever is left in
+    the body (normally only sectPr) and runs to the end of the document.
+    """
+    m = _BODY_OPEN.search(xml)
+    if m is None:
+        raise ValueError("template document.xml has no <w:body>")
+    return xml[:m.end()], xml[m.end():]
+
+
+def zip_compression(save_profile: str) -> int:
+    """Zip compression method of a save profile (see SAVE_PROFILES)"""
+    try:
+        return SAVE_PROFILES[save_profile]
+    except KeyError:
+        raise ValueError(f"unknown save profile: {save_profile!r}") from None
+
+
+def add_character_styles(doc: DocumentObject, styles: StyleIndex) -> list[str]:
+    """Define the character styles of character style mode that the template lacks
+
+    Strong is bold, Emphasis italic and Inline Code uses the code font, like the direct
+    formatting they replace; template authors can restyle them afterwards.
+
+    Args:
+        doc: Document whose styles part is extended
+        styles: Style index of doc before the change
+
+    Returns:
+        Names of the styles added
+    """
+    base = styles.style_id("Default Paragraph Font", "character")
+    added = []
+    for name, builtin, priority in _CHARACTER_STYLES:
+        if name not in styles.missing_character_styles:
+            continue
+        try:
+            style = doc.styles.add_style(name, WD_STYLE_TYPE.CHARACTER, builtin=builtin)
+        except ValueError:
+            # 同名的段落样式等已存在：该格式保持直接设置
+            continue
+        if base is not None:
+            style.element.basedOn_val = base
+        style.priority = priority
+        style.quick_style = True
+        if name == STRONG_STYLE:
+            style.font.bold = True
+        elif name == EMPHASIS_STYLE:
+            style.font.italic = True
+        else:
+            style.font.name = CODE_FONT
+        added.append(name)
+    return added
+
+
+class _ZipPartWriter:
+    """PhysPkgWriter replacement that writes package parts with a chosen zip compression"""
+
+    def __init__(self, output, compression: int):
+        self._zip = zipfile.ZipFile(output, "w", compression=compression)
+
+    def write(self, pack_uri, blob: bytes) -> None:
+        self._zip.writestr(pack_uri.membername, blob)
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+def save_document(doc: DocumentObject, output, save_profile: str = EXPORT) -> None:
+    """Save a python-docx document using the zip compression of a save profile
+
+    Args:
+        doc: Document to save
+        output: Output path or binary file object
+        save_profile: "export" (deflate, same as doc.save) or "preview" (stored entries)
+    """
+    compression = zip_compression(save_profile)
+    if compression == zipfile.ZIP_DEFLATED:
+        doc.save(output)
+        return
+    # 与 OpcPackage.save / PackageWriter.write 相同，只是不压缩
+    package = doc.part.package
+    for part in package.parts:
+        part.before_marshal()
+    writer = _ZipPartWriter(output, compression)
+    try:
+        PackageWriter._write_content_types_stream(writer, package.parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, package.parts)
+    finally:
+        writer.close()
+
+
+class TemplatePackage:
+    """Raw template parts for writers that bypass python-docx
+
+    Attributes:
+        parts: (name, data) of every package part except word/document.xml, copied verbatim
+        document_head: document.xml up to and including the <w:body> start tag
+        document_tail: rest of the stripped document.xml (sectPr and closing tags)
+        styles: Style index of the template
+        text_width: Width between the page margins in twips (for table columns)
+    """
+
+    __slots__ = ("parts", "document_head", "document_tail", "styles", "text_width")
+
+    def __init__(
+        self, template_path: str | None, package: OpcPackage, styles: StyleIndex, styles_xml: bytes | None = None
+    ):
+        """Build from the template file, its stripped, parsed package and style index
+
+        styles_xml replaces the template's styles part (character style mode adds styles).
+        """
+        source = template_path if template_path and os.path.exists(template_path) else _default_docx_path()
+        with zipfile.ZipFile(source) as z:
+            self.parts = [(name, z.read(name)) for name in z.namelist() if name != DOCUMENT_PART]
+        if styles_xml is not None:
+            self.parts = [(name, styles_xml if name == STYLES_PART else data) for name, data in self.parts]
+
+        document_xml = etree.tostring(
+            package.main_document_part.element, xml_declaration=True, encoding="UTF-8", standalone=True
+        )
+        self.document_head, self.document_tail = split_document_xml(document_xml)
+        self.styles = styles
+        self.text_width = section_text_width(package.main_document_part.document)
+
+
+class _TemplateEntry:
+    """Cached state for one template file"""
+
+    __slots__ = ("package", "styles", "raw", "variant", "lock")
+
+    def __init__(self, package: OpcPackage):
+        self.package = package
+        # 样式索引在模板加载时构建一次
+        self.styles = StyleIndex(package.main_document_part.document.styles.element)
+        self.raw: TemplatePackage | None = None
+        # 字符样式模式使用的模板 (补齐缺失的字符样式)，首次使用时创建
+        self.variant: _TemplateEntry | None = None
+        self.lock = threading.Lock()
+
+    def character_variant(self) -> "_TemplateEntry":
+        """Entry for character style mode: this template plus the character styles it lacks"""
+        with self.lock:
+            if self.variant is None:
+                if not self.styles.missing_character_styles:
+                    self.variant = self
+                else:
+                    package = copy.deepcopy(self.package)
+                    add_character_styles(package.main_document_part.document, self.styles)
+                    self.variant = _TemplateEntry(package)
+                    self.variant.variant = self.variant
+            return self.variant
+
+
+class TemplateCache:
+    """Cache of parsed, pre-stripped Word templates keyed by path, mtime and size"""
+
+    def __init__(self, max_entries: int = 8):
+        """Initialize template cache
+
+        Args:
+            max_entries: Maximum number of templates kept in memory
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple, _TemplateEntry] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def identity(template_path: str | None) -> tuple:
+        """Build the cache key (identity) of a template path
+
+        Args:
+            template_path: Path to template file (.docx), or None for the default template
+
+        Returns:
+            Tuple of (absolute path, mtime_ns, size), or an empty tuple for the default template
+        """
+        if not template_path or not os.path.exists(template_path):
+            return ()
+        st = os.stat(template_path)
+        return (os.path.abspath(template_path), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _load(template_path: str | None) -> OpcPackage:
+        """Parse a template and strip its body content, keeping styles and section settings"""
+        if not template_path or not os.path.exists(template_path):
+            return Document().part.package
+
+        doc = Document(template_path)
+        # 清空模板内容，仅保留样式
+        for p in doc.paragraphs:
+            p._element.getparent().remove(p._element)
+        for t in doc.tables:
+            t._element.getparent().remove(t._element)
+        return doc.part.package
+
+    def _entry(self, template_path: str | None) -> _TemplateEntry:
+        """Get (loading on a miss) the cache entry for a template"""
+        key = self.identity(template_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                # 刷新 LRU 顺序
+                self._entries[key] = self._entries.pop(key)
+                return entry
+            self.misses += 1
+
+        entry = _TemplateEntry(self._load(template_path))
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        return entry
+
+    def _variant(self, template_path: str | None, character_styles: bool) -> _TemplateEntry:
+        """Get the cache entry of a template, or of its character style variant"""
+        entry = self._entry(template_path)
+        return entry.character_variant() if character_styles else entry
+
+    def get(self, template_path: str | None, character_styles: bool = False) -> DocumentObject:
+        """Get a private, writable copy of the stripped template
+
+        Args:
+            template_path: Path to template file (.docx), or None for the default template
+            character_styles: Whether to include the character styles of character style mode
+                (Strong, Emphasis, Inline Code); missing ones are created once per template
+
+        Returns:
+            A python-docx Document that the caller may freely modify
+        """
+        return copy.deepcopy(self._variant(template_path, character_styles).package).main_document_part.document
+
+    def get_styles(self, template_path: str | None, character_styles: bool = False) -> StyleIndex:
+        """Get the style index of a template (shared, read-only)
+
+        Args:
+            template_path: Path to template file (.docx), or None for the default template
+            character_styles: See get
+        """
+        return self._variant(template_path, character_styles).styles
+
+    def get_package(self, template_path: str | None, character_styles: bool = False) -> TemplatePackage:
+        """Get the raw template parts for direct OOXML writing (shared, read-only)
+
+        Args:
+            template_path: Path to template file (.docx), or None for the default template
+            character_styles: See get
+        """
+        base = self._entry(template_path)
+        entry = base.character_variant() if character_styles else base
+        with entry.lock:
+            if entry.raw is None:
+                styles_xml = None
+                if entry is not base:
+                    styles_xml = etree.tostring(
+                        entry.package.main_document_part.document.styles.element,
+                        xml_declaration=True,
+                        encoding="UTF-8",
+                        standalone=True,
+                    )
+                entry.raw = TemplatePackage(template_path, entry.package, entry.styles, styles_xml)
+            return entry.raw
+
+    def clear(self) -> None:
+        """Drop all cached templates and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        """Get cache hit/miss counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# 进程内共享的默认缓存
+default_template_cache = TemplateCache()
@@ -0,0 +1,85 @@
+"""Text preview backend
+
+从中间文档模型生成预览用的 Markdown 文本。
+"""
+
+import re
+
+from .document_model import BULLET, CODE_BLOCK, HEADING, NO_LIST, ORDERED, PARAGRAPH, TABLE, Block, Cell, normalize_settings
+
+_BACKTICKS = re.compile("`+")
+
+# 对齐方式 -> 分隔行
+_ALIGN_MARKERS = {None: "---", "left": ":---", "center": ":---:", "right": "---:"}
+
+
+def _pipe_row(cells: list[Cell]) -> str:
+    """Re-emit a table row as a GFM pipe row (escaping literal pipes)"""
+    return "| " + " | ".join(c.source.replace("|", "\\|") for c in cells) + " |"
+
+
+class TextRenderer:
+    """Renders document blocks to preview lines via table-driven dispatch"""
+
+    def __init__(self, settings: dict | None = None):
+        """Initialize text renderer
+
+        Args:
+            settings: Converter settings
+        """
+        self.ignore_bullets, ordered_style = normalize_settings(settings)
+        self.numbered = ordered_style in ("text", "list")
+        self._handlers = {
+            HEADING: self._heading,
+            PARAGRAPH: self._paragraph,
+            TABLE: self._table,
+            CODE_BLOCK: self._code_block,
+        }
+
+    def render_lines(self, blocks: list[Block]) -> list[str]:
+        """Render blocks to preview lines
+
+        Args:
+            blocks: Blocks from the document model
+
+        Returns:
+            Output lines (not yet joined or stripped)
+        """
+        lines: list[str] = []
+        handlers = self._handlers
+        for block in blocks:
+            handlers[block.kind](block, lines)
+        return lines
+
+    def _heading(self, block: Block, lines: list[str]) -> None:
+        lines.append(f"{'#' * block.level} {block.source}")
+        lines.append("")
+
+    def _paragraph(self, block: Block, lines: list[str]) -> None:
+        line = block.source
+        if block.list_type == BULLET:
+            if not self.ignore_bullets:
+                line = f"• {line}"
+        elif block.list_type == ORDERED:
+            if self.numbered:
+                line = f"{block.ordinal}. {line}"
+        lines.append(line)
+        if block.list_type == NO_LIST:
+            lines.append("")
+
+    def _table(self, block: Block, lines: list[str]) -> None:
+        header, *body = block.rows
+        lines.append(_pipe_row(header))
+        lines.append("| " + " | ".join(_ALIGN_MARKERS.get(a, "---") for a in block.align) + " |")
+        for row in body:
+            lines.append(_pipe_row(row))
+        lines.append("")
+
+    def _code_block(self, block: Block, lines: list[str]) -> None:
+        # 围栏长度需超过代码中最长的连续反引号
+        longest = max((len(m) for m in _BACKTICKS.findall(block.source)), default=0)
+        fence = "`" * max(3, longest + 1)
+        lines.append(f"{fence}{block.lang}")
+        lines.append(block.source)
+        lines.append(fence)
+        lines.append("")
@@ -0,0 +1,188 @@
+"""python-docx Word backend
+
+从中间文档模型生成 Word 文档内容，是其他 Word 后端的参考实现。
+"""
+
+import io
+
+from docx.document import Document as DocumentObject
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from .document_model import (
+    BOLD,
+    BREAK,
+    BULLET,
+    CODE,
+    CODE_BLOCK,
+    DEFAULT_SETTINGS,
+    HEADING,
+    IMAGE,
+    ITALIC,
+    ORDERED,
+    PARAGRAPH,
+    TABLE,
+    Block,
+    Run,
+    normalize_settings,
+)
+from .images import ImageData, ImageEmbedder
+from .ooxml_fragments import (
+    CODE_FONT,
+    RPR,
+    character_rpr_table,
+    character_run_plan,
+    code_block_xml,
+    section_text_width,
+    table_xml,
+)
+from .style_index import StyleIndex
+
+_W_NAMESPACE = " " + nsdecls("w")
+
+
+class DocxImageEmbedder(ImageEmbedder):
+    """Adds images through python-docx, which names the media part and relationship"""
+
+    def __init__(
+        self, doc: DocumentObject, text_width: int, base_dir: str | None = None, local_files: bool = True
+    ):
+        super().__init__(text_width, base_dir, local_files)
+        self.doc = doc
+
+    def _add_part(self, image: ImageData) -> str:
+        rid, _ = self.doc.part.get_or_add_image(io.BytesIO(image.data))
+        return rid
+
+
+class WordRenderer:
+    """Renders document blocks into a python-docx Document via table-driven dispatch"""
+
+    def __init__(self, doc: DocumentObject, settings: dict | None = None, styles: StyleIndex | None = None):
+        """Initialize Word renderer
+
+        Args:
+            doc: Target document (usually a stripped template copy)
+            settings: Converter settings
+            styles: Style index of the template; built from doc when omitted
+        """
+        self.doc = doc
+        self.ignore_bullets, self.ordered_style = normalize_settings(settings)
+        self.code_highlight = bool((settings or {}).get("code_highlight", DEFAULT_SETTINGS["code_highlight"]))
+        self.styles = styles if styles is not None else StyleIndex(doc.styles.element)
+        # 字符样式模式: run 引用 Strong / Emphasis / Inline Code，只有样式未覆盖的格式才直接设置
+        if (settings or {}).get("character_styles", DEFAULT_SETTINGS["character_styles"]):
+            style_ids = (self.styles.strong_id, self.styles.emphasis_id, self.styles.code_char_id)
+            self._run_plan = character_run_plan(*style_ids)
+            self._rpr = character_rpr_table(*style_ids)
+        else:
+            self._run_plan = None
+            self._rpr = RPR
+        self._handlers = {
+            HEADING: self._heading,
+            PARAGRAPH: self._paragraph,
+            TABLE: self._table,
+            CODE_BLOCK: self._code_block,
+        }
+        self._text_width = section_text_width(doc)
+        self.images = DocxImageEmbedder(
+            doc,
+            self._text_width,
+            (settings or {}).get("image_base_dir", DEFAULT_SETTINGS["image_base_dir"]),
+            bool((settings or {}).get("local_images", DEFAULT_SETTINGS["local_images"])),
+        )
+
+    def render(self, blocks: list[Block]) -> None:
+        """Append all blocks to the document
+
+        Args:
+            blocks: Blocks from the document model
+        """
+        # 先并发读取本批次引用的全部图片
+        self.images.prepare(blocks)
+        handlers = self._handlers
+        for block in blocks:
+            handlers[block.kind](block)
+
+    def _heading(self, block: Block) -> None:
+        # 标题通常不分行，直接由样式控制；模板缺少该级标题样式时保持正文样式
+        p = self.doc.add_paragraph()
+        style_id = self.styles.heading_ids.get(block.level)
+        if style_id is not None:
+            p._p.style = style_id
+        self._emit_runs(p, block.runs)
+
+    def _paragraph(self, block: Block) -> None:
+        # 准备前缀和样式
+        style_id = None
+        prefix = ""
+
+        if block.list_type == BULLET:
+            if not self.ignore_bullets:
+                prefix = "• "
+        elif block.list_type == ORDERED:
+            if self.ordered_style == 'list' and not self.styles.manual_numbering:
+                # 使用 Word 原生样式
+                style_id = self.styles.list_id
+            elif self.ordered_style in ('text', 'list'):
+                # 模板里没有 'List' 时回退到手动数字
+                prefix = f"{block.ordinal}. "
+            # 'none' 什么都不做
+
+        # === 创建第一段 ===
+        p = self.doc.add_paragraph()
+        if style_id is not None:
+            p._p.style = style_id
+
+        # 写入前缀
+        if prefix:
+            p.add_run(prefix)
+
+        # 换行后的段落使用默认样式(Normal)，避免第二行也带上列表编号
+        self._emit_runs(p, block.runs)
+
+    def _table(self, block: Block) -> None:
+        # 整张表一次性生成 XML 再插入，避免 add_row / cell() 逐格创建代理对象
+        tbl = parse_xml(
+            table_xml(block, self._text_width, self.styles.table_id, _W_NAMESPACE, self.images.run_xml, self._rpr)
+        )
+        self.doc.element.body._insert_tbl(tbl)
+
+    def _code_block(self, block: Block) -> None:
+        # 与表格相同，整块生成 XML 后一次解析
+        body = self.doc.element.body
+        xml = code_block_xml(block, self.styles.code_paragraph_id, self.code_highlight)
+        for p in parse_xml(f"<w:body{_W_NAMESPACE}>{xml}</w:body>"):
+            body._insert_p(p)
+
+    def _emit_runs(self, paragraph, runs: list[Run], style=None) -> None:
+        """Write runs into a paragraph; each BREAK starts a new paragraph with the given style"""
+        curr_p = paragraph
+        plan = self._run_plan
+        for r in runs:
+            flags = r.flags
+            if flags & BREAK:
+                curr_p = self.doc.add_paragraph(style=style)
+                continue
+            if flags & IMAGE:
+                xml = self.images.run_xml(r)
+                if xml:
+                    curr_p._p.append(parse_xml(f"<w:p{_W_NAMESPACE}>{xml}</w:p>")[0])
+                continue
+            run = curr_p.add_run(r.text)
+            if plan is not None:
+                style_id, bold, italic, code = plan[flags & 7]
+                if style_id is not None:
+                    run._r.style = style_id
+                if bold:
+                    run.bold = True
+                if italic:
+                    run.italic = True
+                if code:
+                    run.font.name = CODE_FONT
+                continue
+            # apply the font settings
+            run.bold = bool(flags & BOLD)
+            run.italic = bool(flags & ITALIC)
+            if flags & CODE:
+                run.font.name = CODE_FONT
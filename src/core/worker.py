@@ -0,0 +1,90 @@
+"""Process pool worker helpers
+
+每个工作进程只创建一次 PureConverter，并预热 markdown-it 解析器与模板缓存，
+之后的任务都复用这份状态。
+"""
+
+import os
+import time
+
+from ..utils.text_loader import read_text
+from .pure_converter import PureConverter
+
+_converter: PureConverter | None = None
+# 未指定模板时使用的模板 (init_worker 传入)
+_default_template: str | None = None
+
+
+def init_worker(template_path: str | None = None, collect_stats: bool = False, parse_workers: int | None = 1) -> None:
+    """Initialize the per-process converter and warm its parser and template
+
+    Args:
+        template_path: Path to template file (.docx)
+        collect_stats: Whether to record per-stage timings and counters for each file
+        parse_workers: Processes used to parse very large files, see PureConverter
+    """
+    global _converter, _default_template
+    _default_template = template_path
+    # 批量转换的文件互不相同，不保留解析缓存
+    _converter = PureConverter(
+        template_path=template_path, collect_stats=collect_stats, parse_workers=parse_workers, parse_cache_size=0
+    )
+    _converter.warm_up()
+
+
+def get_converter() -> PureConverter:
+    """Get the per-process converter, initializing it with the default template if needed"""
+    if _converter is None:
+        init_worker()
+    return _converter  # type: ignore[return-value]
+
+
+def convert_file(
+    src: str, dst: str, settings: dict, engine: str = "docx"
+) -> tuple[str, str | None, float, dict | None]:
+    """Convert one Markdown file to a .docx file
+
+    Args:
+        src: Source Markdown file path
+        dst: Output .docx path; parent directories are created as needed
+        settings: Converter settings
+        engine: Word backend, see PureConverter.convert_to_word
+
+    Returns:
+        Tuple of (source path, error message or None, elapsed seconds,
+        stats snapshot or None when statistics are disabled)
+    """
+    start = time.perf_counter()
+    converter = get_converter()
+    try:
+        # 与界面导入相同，自动识别编码 (UTF-8 / GB18030 / 带 BOM 的 UTF-16 等)
+        md_text, _ = read_text(src)
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        if not settings.get("image_base_dir"):
+            # 相对图片路径相对于源文件所在目录
+            settings = {**settings, "image_base_dir": os.path.dirname(os.path.abspath(src))}
+        converter.convert_to_word(md_text, dst, settings, engine=engine)
+    except Exception as e:
+        return src, f"{type(e).__name__}: {e}", time.perf_counter() - start, None
+    stats = converter.last_stats.as_dict() if converter.last_stats.enabled else None
+    return src, None, time.perf_counter() - start, stats
+
+
+def convert_markdown(
+    md_text: str, settings: dict, template_path: str | None = None, engine: str = "docx"
+) -> bytes:
+    """Convert Markdown text to .docx bytes in memory
+
+    Args:
+        md_text: Markdown text
+        settings: Converter settings
+        template_path: Path to template file (.docx), None for the worker's default template
+        engine: Word backend, see PureConverter.convert_to_word
+
+    Returns:
+        .docx file content
+    """
+    converter = get_converter()
+    # 模板缓存按路径保存多份模板，切换模板不需要重新加载
+    converter.set_template_path(template_path if template_path is not None else _default_template)
+    return converter.convert_to_bytes(md_text, settings, engine=engine)
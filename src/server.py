@@ -0,0 +1,389 @@
+"""Headless HTTP conversion service
+
+Started with ``python main.py serve``; binds to localhost by default::
+
+    POST /convert   {"markdown": "...", "settings": {...}, "template": "id", "engine": "docx"}
+                    -> .docx bytes
+    GET  /metrics   queue depth, latency percentiles, worker utilization (JSON)
+    GET  /templates available template IDs
+    GET  /health
+
+settings 只接受 CLIENT_SETTINGS 中的选项；图片只嵌入 data: URI，不读取服务器上的文件。
+
+转换在有界进程池中执行，每个工作进程保留一份预热过的 PureConverter 及其模板缓存。
+同一时间最多 workers 个请求在池中运行，其余请求排队；排队数超过 max_queue 时直接
+返回 503，避免无限堆积。
+
+This module must not import flet.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from src.core import worker
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DEFAULT_TEMPLATE_ID = "default"
+
+# 请求体上限
+MAX_BODY_BYTES = 64 << 20
+# 用于计算延迟分位数的最近请求数
+LATENCY_WINDOW = 1024
+# 客户端可以设置的转换选项；image_base_dir 等涉及服务器文件系统的选项不开放
+CLIENT_SETTINGS = ("ignore_bullets", "ordered_list_style", "code_highlight", "character_styles")
+# 服务端转换不读取本地图片文件，只嵌入 data: URI
+SERVER_SETTINGS = {"local_images": False}
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """An error answered with a JSON body and the given status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ServerMetrics:
+    """Request counters, latency window and worker busy time"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> dict:
+        """JSON-serializable metrics"""
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "workers": self.workers,
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            # 进程池自启动以来的忙碌比例
+            "worker_utilization": round(self.busy_seconds / (uptime * self.workers), 4) if uptime > 0 else 0.0,
+            "latency_ms": {
+                "count": len(latencies),
+                "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+                "p90": round(_percentile(latencies, 0.90) * 1000, 2),
+                "p99": round(_percentile(latencies, 0.99) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            },
+        }
+
+
+def discover_templates(template_dir: str | None, default_template: str | None) -> dict[str, str | None]:
+    """Map template IDs (file stems) to paths
+
+    Args:
+        template_dir: Directory of .docx templates, or None
+        default_template: Template used when a request names none
+
+    Returns:
+        Dict of template ID -> path; DEFAULT_TEMPLATE_ID is always present
+    """
+    templates: dict[str, str | None] = {DEFAULT_TEMPLATE_ID: default_template}
+    if template_dir:
+        for path in sorted(Path(template_dir).glob("*.docx")):
+            if not path.name.startswith("~$"):
+                templates[path.stem] = str(path)
+    return templates
+
+
+class ConversionServer:
+    """asyncio HTTP front end over a bounded conversion process pool"""
+
+    def __init__(
+        self,
+        templates: dict[str, str | None],
+        workers: int | None = None,
+        max_queue: int = 256,
+    ):
+        """Initialize server
+
+        Args:
+            templates: Template ID -> path, see discover_templates
+            workers: Number of worker processes, defaults to CPU count
+            max_queue: Maximum number of requests waiting for a worker
+        """
+        self.templates = templates
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.metrics = ServerMetrics(self.workers)
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        """Run until cancelled"""
+        self._pool = self._new_pool()
+        self._slots = asyncio.Semaphore(self.workers)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        addresses = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in server.sockets)
+        print(f"🚀 PureDoc 服务已启动: {addresses} ({self.workers} 个工作进程)", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=worker.init_worker,
+            initargs=(self.templates.get(DEFAULT_TEMPLATE_ID),),
+        )
+
+    def _replace_broken_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker process died (OOM, crash); later requests use the new pool"""
+        # 同时失败的多个请求只重建一次
+        if self._pool is pool:
+            self._pool = self._new_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def convert(self, md_text: str, settings: dict, template_id: str | None, engine: str) -> bytes:
+        """Convert on the process pool, queueing while all workers are busy"""
+        template_id = template_id or DEFAULT_TEMPLATE_ID
+        if template_id not in self.templates:
+            raise HTTPError(404, f"unknown template: {template_id}")
+        if engine not in ("docx", "ooxml"):
+            raise HTTPError(400, f"unknown engine: {engine}")
+
+        metrics = self.metrics
+        if metrics.queued >= self.max_queue:
+            metrics.rejected += 1
+            raise HTTPError(503, "conversion queue is full")
+
+        metrics.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            metrics.queued -= 1
+
+        metrics.in_flight += 1
+        start = time.monotonic()
+        pool = self._pool
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                pool,
+                worker.convert_markdown,
+                md_text,
+                settings,
+                self.templates[template_id],
+                engine,
+            )
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            raise HTTPError(503, "conversion worker exited unexpectedly, please retry")
+        finally:
+            metrics.busy_seconds += time.monotonic() - start
+            metrics.in_flight -= 1
+            self._slots.release()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line or not request_line.strip():
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(
+        self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Parse and answer one request
+
+        Returns:
+            Whether the connection may be kept alive
+        """
+        start = time.monotonic()
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            await self._respond(writer, 400, _json_body({"error": "malformed request line"}), keep_alive=False)
+            return False
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line or line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        raw_length = headers.get("content-length") or "0"
+        try:
+            # int() 也接受 "+1"、"-1"、" 1" 和 "1_0"，这里只允许十进制数字
+            if not (raw_length.isascii() and raw_length.isdigit()):
+                raise ValueError(raw_length)
+            length = int(raw_length)
+        except ValueError:
+            await self._respond(writer, 400, _json_body({"error": "invalid Content-Length"}), keep_alive=False)
+            return False
+        if length > MAX_BODY_BYTES:
+            await self._respond(writer, 413, _json_body({"error": "request body too large"}), keep_alive=False)
+            return False
+        body = await reader.readexactly(length) if length else b""
+
+        path = urlsplit(target).path
+        is_convert = path == "/convert"
+        if is_convert:
+            self.metrics.requests += 1
+        try:
+            status, content_type, payload = await self._route(method, path, headers, body)
+        except HTTPError as e:
+            status, content_type, payload = e.status, "application/json", _json_body({"error": str(e)})
+        except Exception as e:
+            status, content_type, payload = 500, "application/json", _json_body({"error": f"{type(e).__name__}: {e}"})
+
+        if is_convert:
+            if status == 200:
+                self.metrics.latencies.append(time.monotonic() - start)
+            else:
+                self.metrics.errors += 1
+        await self._respond(writer, status, payload, content_type, keep_alive)
+        return keep_alive
+
+    async def _route(self, method: str, path: str, headers: dict, body: bytes) -> tuple[int, str, bytes]:
+        """Dispatch a request; returns (status, content type, body)"""
+        if path == "/convert":
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            md_text, settings, template_id, engine = _parse_convert_request(headers, body)
+            data = await self.convert(md_text, settings, template_id, engine)
+            return 200, DOCX_MIME, data
+        if method != "GET":
+            raise HTTPError(405, "use GET")
+        if path == "/metrics":
+            return 200, "application/json", _json_body(self.metrics.snapshot())
+        if path == "/templates":
+            return 200, "application/json", _json_body({"templates": sorted(self.templates)})
+        if path == "/health":
+            return 200, "application/json", _json_body({"status": "ok"})
+        raise HTTPError(404, f"no such endpoint: {path}")
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: bytes,
+        content_type: str = "application/json",
+        keep_alive: bool = True,
+    ) -> None:
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1"))
+        writer.write(payload)
+        await writer.drain()
+
+
+def _json_body(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_convert_request(headers: dict, body: bytes) -> tuple[str, dict, str | None, str]:
+    """Extract (markdown, settings, template ID, engine) from a /convert request body
+
+    JSON bodies carry all fields; any other content type is taken as the Markdown text
+    itself with default settings. Settings other than CLIENT_SETTINGS are ignored, and
+    images are only embedded from data: URIs (SERVER_SETTINGS).
+    """
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPError(400, "body must be UTF-8")
+    if content_type != "application/json":
+        return text, dict(SERVER_SETTINGS), None, "docx"
+
+    try:
+        request = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get("markdown"), str):
+        raise HTTPError(400, "'markdown' (string) is required")
+    settings = request.get("settings") or {}
+    if not isinstance(settings, dict):
+        raise HTTPError(400, "'settings' must be an object")
+    settings = {key: settings[key] for key in CLIENT_SETTINGS if key in settings}
+    settings.update(SERVER_SETTINGS)
+    template_id = request.get("template")
+    if template_id is not None and not isinstance(template_id, str):
+        raise HTTPError(400, "'template' must be a string")
+    engine = request.get("engine") or "docx"
+    if not isinstance(engine, str):
+        raise HTTPError(400, "'engine' must be a string")
+    return request["markdown"], settings, template_id, engine
+
+
+def run_server(
+    host: str,
+    port: int,
+    templates: dict[str, str | None],
+    workers: int | None = None,
+    max_queue: int = 256,
+) -> int:
+    """Run the server until interrupted
+
+    Returns:
+        Process exit code
+    """
+    server = ConversionServer(templates, workers=workers, max_queue=max_queue)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        print("服务已停止", file=sys.stderr)
+    return 0
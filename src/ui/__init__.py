@@ -3,5 +3,7 @@
 from .theme import Theme
 from .toolbar import Toolbar
 from .main_page import MainPage
+from .preview_scheduler import PreviewScheduler
+from .paged_preview import PagedPreview
 
-__all__ = ["Theme", "Toolbar", "MainPage"]
+__all__ = ["Theme", "Toolbar", "MainPage", "PreviewScheduler", "PagedPreview"]
@@ -1,18 +1,35 @@
 """Main page UI component for PureDoc"""
 
-from typing import Callable
+import asyncio
+import os
+import threading
+from typing import TYPE_CHECKING, Callable
 from pathlib import Path
 
 import flet as ft
 
 from src.ui.theme import Theme
 from src.ui.toolbar import Toolbar
+from src.ui.preview_scheduler import PreviewScheduler
+from src.ui.paged_preview import PAGED_PREVIEW_CHARS, PagedPreview
 from src.utils.file_picker import FilePickerHandler
 from src.utils import get_download_path, get_resource_path
-from src.core.pure_converter import PureConverter
+from src.core.result_cache import ResultCache
 from src.utils.platform import PlatformUtils
+from src.utils.startup import FIRST_PREVIEW, PARSER_READY, startup_timer
+from src.utils.text_loader import LoadCancelled, read_text
+
+# 转换器 (markdown-it、python-docx) 在窗口出现后于后台线程中加载
+if TYPE_CHECKING:
+    from src.core.incremental_preview import IncrementalPreview
+    from src.core.pure_converter import PureConverter
+
+import shutil
+
+# 超过该字符数的文件以大文档模式打开：编辑器只读显示开头部分，预览与导出使用全文
+LARGE_DOCUMENT_CHARS = 2_000_000
+EDITOR_EXCERPT_CHARS = 100_000
 
-import os
 
 class MainPage:
     """Main application page"""
@@ -24,10 +41,23 @@ class MainPage:
             page: Flet Page object
         """
         self.page = page
-        
-        # # Initialize converter
-        self.converter = PureConverter(
-            template_path=get_resource_path('template/template.docx'),
+        self.template_path = get_resource_path('template/template.docx')
+
+        # Converter and incremental preview engine are created lazily (see _warm_up)
+        self._converter: "PureConverter | None" = None
+        self._preview_engine: "IncrementalPreview | None" = None
+        self._core_lock = threading.Lock()
+
+        # Full text in large document mode (None: the editor holds the whole document)
+        self._document_text: str | None = None
+        self._import_cancel: threading.Event | None = None
+        # Cancel event of the running Word conversion (None: idle)
+        self._convert_cancel: threading.Event | None = None
+        # Live preview runs on a worker thread, debounced while typing
+        self.preview_scheduler = PreviewScheduler(
+            render=self._render_preview,
+            on_result=self._apply_preview,
+            debounce=0.15,
         )
         # markdown converter settings
         self.md_converter_settings = {
@@ -35,8 +65,8 @@ class MainPage:
             "ordered_list_style": "Text"
         }
 
-        # Temporary file for preview
-        self._temp_preview_file = None
+        # Converted .docx files keyed by text, settings and template (preview/export reuse them)
+        self.result_cache = ResultCache(PlatformUtils.get_app_support_path() / "cache")
 
         # File picker handler
         self.file_picker = FilePickerHandler(page)
@@ -52,6 +82,64 @@ class MainPage:
         # Build UI components
         self._build_ui()
 
+        # 窗口出现后再在后台加载并预热解析器
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+        if startup_timer.enabled and startup_timer.sample_text:
+            self.txt_input.value = startup_timer.sample_text
+            self.txt_input.update()
+            self._handle_input_change(None)
+
+    @property
+    def converter(self) -> "PureConverter":
+        """Converter, created on first use (blocks until the warm-up has created it)"""
+        self._ensure_core()
+        return self._converter
+
+    @property
+    def preview_engine(self) -> "IncrementalPreview":
+        """Incremental live preview engine (re-parses only edited blocks)"""
+        self._ensure_core()
+        return self._preview_engine
+
+    @property
+    def source_text(self) -> str:
+        """Markdown source being converted (the full text in large document mode)"""
+        if self._document_text is not None:
+            return self._document_text
+        return self.txt_input.value or ""
+
+    def _ensure_core(self) -> None:
+        """Import and create the converter and preview engine once"""
+        with self._core_lock:
+            if self._converter is None:
+                from src.core.incremental_preview import IncrementalPreview
+                from src.core.pure_converter import PureConverter
+
+                self._converter = PureConverter(template_path=self.template_path)
+                self._preview_engine = IncrementalPreview(self._converter)
+
+    def _warm_up(self) -> None:
+        """Create and warm the parser off the UI thread, then check the template's styles
+
+        python-docx itself is only loaded by the first Word preview or export.
+        """
+        try:
+            self.converter.warm_up(load_template=False)
+            startup_timer.mark(PARSER_READY)
+            self._show_template_styles()
+        except Exception as e:
+            print(f"预热失败: {e}")
+
+    def _show_template_styles(self) -> None:
+        """Show the template name with a warning for missing styles"""
+        template_path = self.converter.template_path
+        if template_path and Path(template_path).exists():
+            from src.core.style_index import read_template_styles
+
+            self.toolbar.set_template_name(template_path, read_template_styles(template_path).missing)
+        else:
+            self.toolbar.set_template_name("", self.converter.get_style_index().missing)
+
     def _build_ui(self) -> None:
         """Build all UI components"""
         # Toolbar
@@ -75,6 +163,37 @@ class MainPage:
             on_change=self._handle_input_change,
         )
 
+        # Import progress and large document mode notice
+        self.import_progress = ft.ProgressBar(value=0, color=Theme.PRIMARY, visible=False)
+        self.large_doc_text = ft.Text("", size=12, color=Theme.TEXT_SECONDARY, expand=True)
+        self.large_doc_banner = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(ft.Icons.INFO_OUTLINE, size=16, color=Theme.WARNING),
+                    self.large_doc_text,
+                    ft.TextButton("在编辑器中加载全文", on_click=self._handle_load_full_text),
+                ],
+                spacing=8,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            padding=ft.Padding.only(bottom=8),
+            visible=False,
+        )
+
+        # Word generation progress (preview / export run on a worker thread)
+        self.convert_progress = ft.ProgressBar(value=None, color=Theme.PRIMARY, expand=True)
+        self.convert_status = ft.Text("", size=12, color=Theme.TEXT_SECONDARY)
+        self.convert_cancel_button = ft.TextButton("取消", on_click=self._handle_cancel_convert)
+        self.convert_bar = ft.Container(
+            content=ft.Row(
+                [self.convert_status, self.convert_progress, self.convert_cancel_button],
+                spacing=12,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER,
+            ),
+            padding=ft.Padding.symmetric(horizontal=16, vertical=4),
+            visible=False,
+        )
+
         # Markdown preview
         self.markdown_view = ft.Markdown(
             value="预览区域",
@@ -83,13 +202,17 @@ class MainPage:
             on_tap_link=self._handle_link_tap,
         )
 
+        self.preview_column = ft.Column(
+            [self.markdown_view],
+            scroll=ft.ScrollMode.AUTO,
+            spacing=0,
+            horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+        )
+        # Huge documents: one control per section, only sections near the viewport rendered
+        self.paged_preview = PagedPreview(on_tap_link=self._handle_link_tap)
+
         self.preview_container = ft.Container(
-            content=ft.Column(
-                [self.markdown_view],
-                scroll=ft.ScrollMode.AUTO,
-                spacing=0,
-                horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
-            ),
+            content=self.preview_column,
             **Theme.get_container_style(has_border=True),
             padding=ft.Padding.all(24),
             expand=True,
@@ -109,6 +232,8 @@ class MainPage:
                             ),
                             padding=ft.Padding.only(bottom=12),
                         ),
+                        self.import_progress,
+                        self.large_doc_banner,
                         ft.Container(
                             content=self.txt_input,
                             **Theme.get_container_style(has_border=True),
@@ -139,7 +264,12 @@ class MainPage:
         )
 
         # Add all components to page
-        self.page.add(self.toolbar.component, ft.Divider(height=1, color=Theme.DIVIDER), self.split_view)
+        self.page.add(
+            self.toolbar.component,
+            ft.Divider(height=1, color=Theme.DIVIDER),
+            self.convert_bar,
+            self.split_view,
+        )
         # Load initial settings
         self._load_settings()
 
@@ -153,10 +283,9 @@ class MainPage:
         self._checkbox_preserve_num.value = True
         self._dropdown_style.value = "text"
 
-        # Update template display
-        template_path = get_resource_path('template/template.docx')
-        if template_path and Path(template_path).exists():
-            self.toolbar.set_template_name(template_path)
+        # Update template display (missing styles are checked by _warm_up)
+        if self.template_path and Path(self.template_path).exists():
+            self.toolbar.set_template_name(self.template_path)
         else:
             self.toolbar.set_template_name("")
 
@@ -166,25 +295,61 @@ class MainPage:
         Args:
             event: Flet control event
         """
-        raw_content = self.txt_input.value
+        raw_content = self.source_text
         if not raw_content:
-            self.markdown_view.value = ""
+            self.preview_scheduler.cancel()
+            self._apply_preview("")
         else:
-            try:
-                processed_md = self.converter.convert_text(
-                    raw_content,
-                    settings=self.md_converter_settings,
-                )
-                self.markdown_view.value = processed_md
-            except Exception as e:
-                self.markdown_view.value = f"**预览错误**: {e}"
-        self.markdown_view.update()
+            self.preview_scheduler.submit(raw_content, dict(self.md_converter_settings))
+
+    def _render_preview(self, raw_content: str, settings: dict) -> str | list[str]:
+        """Convert text for the live preview (runs on the preview worker thread)
+
+        Args:
+            raw_content: Markdown source
+            settings: Snapshot of converter settings
+
+        Returns:
+            Processed Markdown for the preview control, or its sections for huge documents
+        """
+        try:
+            if len(raw_content) >= PAGED_PREVIEW_CHARS:
+                return self.preview_engine.update_sections(raw_content, settings=settings)
+            return self.preview_engine.update(raw_content, settings=settings)
+        except Exception as e:
+            self.preview_engine.reset()
+            return f"**预览错误**: {e}"
+
+    def _apply_preview(self, processed_md: str | list[str]) -> None:
+        """Push the newest preview result to the Markdown view
+
+        Args:
+            processed_md: Processed Markdown to display, or its sections (paged preview)
+        """
+        if isinstance(processed_md, list):
+            mounted = self.preview_container.content is self.paged_preview.component
+            self.paged_preview.set_sections(processed_md, update=mounted)
+            if not mounted:
+                self.markdown_view.value = ""
+                self.preview_container.content = self.paged_preview.component
+                self.preview_container.update()
+        elif self.preview_container.content is not self.preview_column:
+            self.paged_preview.clear()
+            self.markdown_view.value = processed_md
+            self.preview_container.content = self.preview_column
+            self.preview_container.update()
+        else:
+            self.markdown_view.value = processed_md
+            self.markdown_view.update()
+        if processed_md:
+            startup_timer.mark(FIRST_PREVIEW)
 
     def _handle_settings_change(self, e: ft.ControlEvent | None = None) -> None:
         """Handle settings change"""
         # Update converter
         self.md_converter_settings["ignore_bullets"] = self.toolbar.ignore_bullets
         self.md_converter_settings["ordered_list_style"] = self.toolbar.ordered_list_style
+        self.md_converter_settings["character_styles"] = self.toolbar.character_styles
 
         # Refresh preview
         self._handle_input_change(None)
@@ -201,11 +366,9 @@ class MainPage:
             dialog_title="选择 Markdown 文件",
             initial_directory=export_dir,
         )
-        self._on_file_picker_result(files)
-        # refresh preview
-        self._handle_input_change(None)
+        await self._on_file_picker_result(files)
 
-    def _on_file_picker_result(self, files: list[ft.FilePickerFile]) -> None:
+    async def _on_file_picker_result(self, files: list[ft.FilePickerFile]) -> None:
         """Handle file picker result
 
         Args:
@@ -218,24 +381,86 @@ class MainPage:
         if file_path:
             # Handle based on file extension
             if file_path.lower().endswith(('.md', '.markdown')):
-                self._on_file_imported(file_path)
+                await self._on_file_imported(file_path)
             elif file_path.lower().endswith('.docx'):
                 self._on_template_selected(file_path)            
 
-    def _on_file_imported(self, file_path: str) -> None:
+    async def _on_file_imported(self, file_path: str) -> None:
         """Handle imported markdown file
 
+        The file is read in chunks on a worker thread (encoding detected from its first
+        bytes) while a progress bar is shown; a newer import cancels a running one.
+
         Args:
             file_path: Path to imported file
         """
+        if self._import_cancel is not None:
+            self._import_cancel.set()
+        cancel = self._import_cancel = threading.Event()
+        self.import_progress.value = 0
+        self.import_progress.visible = True
+        self.import_progress.update()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.txt_input.value = content
-            self.txt_input.update()
-            self._show_message(f"已导入: {Path(file_path).name}")
+            content, encoding = await asyncio.to_thread(read_text, file_path, self._report_import_progress, cancel)
+        except LoadCancelled:
+            return
         except Exception as e:
             self._show_message(f"导入失败: {e}", is_error=True)
+            return
+        finally:
+            if self._import_cancel is cancel:
+                self._import_cancel = None
+                self.import_progress.visible = False
+                self.import_progress.update()
+
+        self._set_document(content)
+        # 文档中的相对图片路径相对于 Markdown 文件所在目录
+        self.md_converter_settings["image_base_dir"] = str(Path(file_path).resolve().parent)
+        detected = "" if encoding in ("utf-8", "utf-8-sig") else f" ({encoding.upper()})"
+        self._show_message(f"已导入: {Path(file_path).name}{detected}")
+        self._handle_input_change(None)
+
+    def _report_import_progress(self, done: int, total: int) -> None:
+        """Update the import progress bar (called on the reading thread)"""
+        value = done / total if total else 1.0
+        # 每增加 1% 才刷新一次
+        if value >= 1.0 or value - (self.import_progress.value or 0) >= 0.01:
+            self.import_progress.value = value
+            self.import_progress.update()
+
+    def _set_document(self, content: str) -> None:
+        """Put imported text into the editor, switching to large document mode for huge files"""
+        if len(content) >= LARGE_DOCUMENT_CHARS:
+            self._document_text = content
+            excerpt = content[:EDITOR_EXCERPT_CHARS]
+            # 在行边界截断
+            cut = excerpt.rfind("\n")
+            if cut > 0:
+                excerpt = excerpt[:cut]
+            self.txt_input.value = excerpt
+            self.txt_input.read_only = True
+            self.large_doc_text.value = (
+                f"大文档模式: 编辑器只读显示开头 {len(excerpt):,} / {len(content):,} 个字符，预览与导出使用全文"
+            )
+            self.large_doc_banner.visible = True
+        else:
+            self._document_text = None
+            self.txt_input.value = content
+            self.txt_input.read_only = False
+            self.large_doc_banner.visible = False
+        self.txt_input.update()
+        self.large_doc_banner.update()
+
+    def _handle_load_full_text(self, event) -> None:
+        """Leave large document mode and load the whole text into the editor"""
+        if self._document_text is None:
+            return
+        self.txt_input.value = self._document_text
+        self.txt_input.read_only = False
+        self._document_text = None
+        self.large_doc_banner.visible = False
+        self.txt_input.update()
+        self.large_doc_banner.update()
 
     async def _handle_template_select(self, event) -> None:
         """Handle template button click
@@ -247,7 +472,7 @@ class MainPage:
             allowed_extensions=["docx"],
             dialog_title="选择 Word 模板文件",
         )
-        self._on_file_picker_result(files)
+        await self._on_file_picker_result(files)
 
     def _on_template_selected(self, file_path: str) -> None:
         """Handle selected template file
@@ -257,38 +482,99 @@ class MainPage:
         """
         try:
             self.converter.set_template_path(file_path)
-            self.toolbar.set_template_name(file_path)
+            self.toolbar.set_template_name(file_path, self.converter.get_style_index().missing)
             self._show_message(f"模板已设置: {Path(file_path).name}")
         except Exception as e:
             self._show_message(f"设置模板失败: {e}", is_error=True)
 
-    def _handle_preview(self, event) -> None:
+    async def _convert_in_background(self, save_profile: str) -> Path | None:
+        """Generate the Word document on a worker thread, showing progress and a cancel button
+
+        内容、设置、模板都未变化时直接复用缓存中的文件；取消时缓存中不会留下不完整的文件。
+
+        Args:
+            save_profile: "preview" (uncompressed, opened once) or "export" (fully compressed)
+
+        Returns:
+            Path of the cached .docx, or None if cancelled or another conversion is running
+        """
+        if self._convert_cancel is not None:
+            self._show_message("正在生成 Word 文档，请等待完成或先取消", is_error=True)
+            return None
+        cancel = self._convert_cancel = threading.Event()
+        text = self.source_text
+        settings = dict(self.md_converter_settings)
+        # 解析阶段没有细分进度，先显示不确定进度
+        self.convert_progress.value = None
+        self.convert_status.value = "正在解析..."
+        self.convert_cancel_button.disabled = False
+        self.convert_bar.visible = True
+        self.convert_bar.update()
+
+        def convert() -> Path:
+            return self.converter.convert_cached(
+                text,
+                settings,
+                self.result_cache,
+                progress=self._report_convert_progress,
+                cancel=cancel,
+                save_profile=save_profile,
+            )
+
+        from src.core.pure_converter import ConversionCancelled
+
+        try:
+            return await asyncio.to_thread(convert)
+        except ConversionCancelled:
+            self._show_message("已取消生成 Word 文档")
+            return None
+        finally:
+            self._convert_cancel = None
+            self.convert_bar.visible = False
+            self.convert_bar.update()
+
+    def _report_convert_progress(self, done: int, total: int) -> None:
+        """Update the conversion progress bar (called on the conversion thread)"""
+        if self._convert_cancel is None or self._convert_cancel.is_set():
+            return
+        value = done / total if total else 1.0
+        # 每增加 1% 才刷新一次
+        if done and value < 1.0 and value - (self.convert_progress.value or 0) < 0.01:
+            return
+        self.convert_progress.value = value
+        if done >= total:
+            self.convert_status.value = "正在保存..."
+        else:
+            self.convert_status.value = f"正在生成 Word 文档: {done:,} / {total:,} 块"
+        self.convert_bar.update()
+
+    def _handle_cancel_convert(self, event) -> None:
+        """Cancel the running Word conversion"""
+        if self._convert_cancel is None:
+            return
+        self._convert_cancel.set()
+        self.convert_status.value = "正在取消..."
+        self.convert_cancel_button.disabled = True
+        self.convert_bar.update()
+
+    async def _handle_preview(self, event) -> None:
         """Handle preview button click
 
         Args:
             event: Flet control event
         """
-        if not self.txt_input.value:
+        if not self.source_text:
             self._show_message("内容为空！", is_error=True)
             return
 
-        import tempfile
-        import os
-
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as f:
-                self._temp_preview_file = f.name
-
-            # Convert to temporary Word file
-            self.converter.convert_to_word(
-                self.txt_input.value,
-                self._temp_preview_file,
-                self.md_converter_settings
-            )
+            # 预览文件只会被打开一次，跳过压缩
+            preview_file = await self._convert_in_background("preview")
+            if preview_file is None:
+                return
 
             # Open in QuickLook (macOS) or default viewer
-            PlatformUtils.open_quicklook_preview(self._temp_preview_file)
+            PlatformUtils.open_quicklook_preview(str(preview_file))
 
             self._show_message("已打开原生预览")
 
@@ -301,7 +587,7 @@ class MainPage:
         Args:
             event: Flet control event
         """
-        if not self.txt_input.value:
+        if not self.source_text:
             self._show_message("内容为空！", is_error=True)
             return
         # Get save path
@@ -316,11 +602,19 @@ class MainPage:
             self._show_message(f"导出失败: 未选择保存路径", is_error=True)
             return
         try:
-            self.converter.convert_to_word(
-                self.txt_input.value,
-                str(output_path),
-                self.md_converter_settings
-            )
+            # 复制缓存中的结果 (未命中时先生成)
+            cached_file = await self._convert_in_background("export")
+            if cached_file is None:
+                return
+            # 先复制到同目录的临时文件再改名，目标位置不会出现不完整的文件
+            tmp = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+            try:
+                shutil.copyfile(cached_file, tmp)
+                os.replace(tmp, output_path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
 
             # Open exported file
             PlatformUtils.open_file(str(output_path))
@@ -372,9 +666,11 @@ class MainPage:
     def cleanup(self) -> None:
         """Clean up resources"""
 
-        # Remove temp preview file
-        if self._temp_preview_file and Path(self._temp_preview_file).exists():
-            try:
-                os.unlink(self._temp_preview_file)
-            except Exception:
-                pass
+        # Stop background preview worker
+        self.preview_scheduler.shutdown()
+
+        # Abort running import / Word conversion
+        for cancel in (self._import_cancel, self._convert_cancel):
+            if cancel is not None:
+                cancel.set()
+
@@ -0,0 +1,169 @@
+"""Virtualized, section-paged Markdown preview for huge documents
+
+把整篇预览交给一个 ft.Markdown 时，大文档每次变化都要重新布局整篇内容。这里把预览
+按节 (见 IncrementalPreview.update_sections) 放进各自的容器：只有视口附近的节创建
+Markdown 控件，其余节是按估算高度占位的空容器；内容更新时只替换发生变化的节。
+"""
+
+import math
+import threading
+from typing import Any, Callable
+
+import flet as ft
+
+# 输入超过该字符数时使用分节预览
+PAGED_PREVIEW_CHARS = 100_000
+
+# 高度估算 (像素)
+LINE_HEIGHT = 22
+CHARS_PER_LINE = 90
+SECTION_SPACING = 16
+
+# 视口上下各多渲染多少个视口高度的内容
+OVERSCAN = 1.0
+# 超出多少个视口高度后释放已渲染的节 (大于 OVERSCAN，避免来回切换)
+RELEASE_DISTANCE = 3.0
+# 尚未收到滚动事件时假定的视口高度
+INITIAL_VIEWPORT = 1200
+
+
+def estimate_height(section: str) -> int:
+    """Rough rendered height of a section, used for placeholders and scroll mapping"""
+    lines = 0
+    for line in section.split("\n"):
+        lines += max(1, math.ceil(len(line) / CHARS_PER_LINE))
+    return lines * LINE_HEIGHT + SECTION_SPACING
+
+
+class PagedPreview:
+    """Scrollable preview that renders only the sections near the viewport"""
+
+    def __init__(self, on_tap_link: Callable[[Any], Any] | None = None):
+        """Initialize paged preview
+
+        Args:
+            on_tap_link: Link tap handler passed to every section's Markdown control
+        """
+        self._on_tap_link = on_tap_link
+        self._lock = threading.Lock()
+        self._sections: list[str] = []
+        self._slots: list[ft.Container] = []
+        self._heights: list[int] = []
+        # 视口在内容中的位置 (占总高度的比例)，收到第一次滚动事件前为 None
+        self._viewport: tuple[float, float] | None = None
+
+        self._column = ft.Column(
+            controls=self._slots,
+            scroll=ft.ScrollMode.AUTO,
+            spacing=0,
+            horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
+            on_scroll=self._handle_scroll,
+            scroll_interval=50,
+            expand=True,
+        )
+
+    @property
+    def component(self) -> ft.Column:
+        """Get the preview component"""
+        return self._column
+
+    @property
+    def rendered_count(self) -> int:
+        """Number of sections that currently have a Markdown control"""
+        return sum(1 for slot in self._slots if slot.content is not None)
+
+    def set_sections(self, sections: list[str], update: bool = True) -> None:
+        """Show new preview sections, replacing only those that changed
+
+        Args:
+            sections: Preview sections in document order
+            update: Whether to push the change to the page (False while not mounted)
+        """
+        with self._lock:
+            old = self._sections
+            prefix = 0
+            limit = min(len(old), len(sections))
+            while prefix < limit and old[prefix] == sections[prefix]:
+                prefix += 1
+            suffix = 0
+            while suffix < limit - prefix and old[-1 - suffix] == sections[-1 - suffix]:
+                suffix += 1
+            if prefix == len(old) == len(sections):
+                return
+
+            heights = [estimate_height(text) for text in sections[prefix:len(sections) - suffix]]
+            self._slots[prefix:len(old) - suffix] = [ft.Container(height=height) for height in heights]
+            self._heights[prefix:len(old) - suffix] = heights
+            self._sections = list(sections)
+            self._sync_window()
+
+        if update:
+            # 未变化的节是同一个控件对象，只有新节会发送到客户端
+            self._column.update()
+
+    def clear(self) -> None:
+        """Drop all sections (without updating the page)"""
+        with self._lock:
+            self._sections = []
+            self._slots.clear()
+            self._heights = []
+            self._viewport = None
+
+    def _render(self, index: int) -> None:
+        slot = self._slots[index]
+        slot.content = ft.Markdown(
+            value=self._sections[index],
+            selectable=True,
+            extension_set=ft.MarkdownExtensionSet.GITHUB_FLAVORED,
+            on_tap_link=self._on_tap_link,
+        )
+        slot.height = None
+        slot.padding = ft.Padding.only(bottom=SECTION_SPACING)
+
+    def _release(self, index: int) -> None:
+        slot = self._slots[index]
+        slot.content = None
+        slot.height = self._heights[index]
+        slot.padding = None
+
+    def _sync_window(self) -> list[ft.Container]:
+        """Render sections near the viewport and release far ones
+
+        Returns:
+            Slots whose content changed
+        """
+        total = sum(self._heights)
+        if not total:
+            return []
+        if self._viewport is None:
+            top, bottom = 0.0, float(INITIAL_VIEWPORT)
+        else:
+            top, bottom = self._viewport[0] * total, self._viewport[1] * total
+        span = max(bottom - top, 1.0)
+        render_top, render_bottom = top - OVERSCAN * span, bottom + OVERSCAN * span
+        keep_top, keep_bottom = top - RELEASE_DISTANCE * span, bottom + RELEASE_DISTANCE * span
+
+        changed = []
+        y = 0
+        for i, height in enumerate(self._heights):
+            start, end = y, y + height
+            y = end
+            rendered = self._slots[i].content is not None
+            if not rendered and end >= render_top and start <= render_bottom:
+                self._render(i)
+                changed.append(self._slots[i])
+            elif rendered and (end < keep_top or start > keep_bottom):
+                self._release(i)
+                changed.append(self._slots[i])
+        return changed
+
+    def _handle_scroll(self, e: ft.OnScrollEvent) -> None:
+        """Track the viewport and render the sections that came into range"""
+        extent = e.max_scroll_extent + e.viewport_dimension
+        if extent <= 0:
+            return
+        with self._lock:
+            self._viewport = (e.pixels / extent, (e.pixels + e.viewport_dimension) / extent)
+            changed = self._sync_window()
+        for slot in changed:
+            slot.update()
@@ -0,0 +1,98 @@
+"""Debounced background preview scheduler for PureDoc"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class PreviewScheduler:
+    """Runs preview conversions off the Flet event thread
+
+    Rapid submissions are coalesced within the debounce window, renders run on a
+    single worker thread, and any result that is no longer the newest is dropped
+    instead of being pushed to the UI.
+    """
+
+    def __init__(
+        self,
+        render: Callable[..., Any],
+        on_result: Callable[[Any], None],
+        debounce: float = 0.15,
+    ):
+        """Initialize preview scheduler
+
+        Args:
+            render: Conversion function, called on the worker thread with the submitted arguments
+            on_result: Callback receiving the newest render result
+            debounce: Seconds to wait for further input before rendering
+        """
+        self._render = render
+        self._on_result = on_result
+        self.debounce = debounce
+
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._timer: threading.Timer | None = None
+        # 单线程执行，保证渲染 (以及增量预览引擎的状态) 串行
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self._closed = False
+
+    def submit(self, *args: Any) -> None:
+        """Schedule a render for the given arguments, superseding any pending one
+
+        Args:
+            *args: Arguments passed to the render function
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._generation += 1
+            generation = self._generation
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.debounce > 0:
+                self._timer = threading.Timer(self.debounce, self._dispatch, (generation, args))
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self._dispatch(generation, args)
+
+    def cancel(self) -> None:
+        """Drop pending and in-flight renders without scheduling a new one"""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def shutdown(self) -> None:
+        """Cancel pending work and stop the worker thread"""
+        self.cancel()
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _is_current(self, generation: int) -> bool:
+        """Check whether a generation is still the newest submission"""
+        with self._lock:
+            return generation == self._generation and not self._closed
+
+    def _dispatch(self, generation: int, args: tuple) -> None:
+        """Hand a debounced submission to the worker thread"""
+        if not self._is_current(generation):
+            return
+        try:
+            self._executor.submit(self._run, generation, args)
+        except RuntimeError:
+            # executor 已关闭
+            pass
+
+    def _run(self, generation: int, args: tuple) -> None:
+        """Render on the worker thread and publish the result if it is still current"""
+        # 排队期间已有更新的输入，直接丢弃
+        if not self._is_current(generation):
+            return
+        result = self._render(*args)
+        if self._is_current(generation):
+            self._on_result(result)
@@ -57,6 +57,14 @@ class Toolbar:
         )
         self._checkbox_preserve_num.on_change = self._handle_setting_change
 
+        self._checkbox_character_styles = ft.Checkbox(
+            label="字符样式",
+            value=False,
+            tooltip="加粗、斜体、行内代码使用模板中的 Strong / Emphasis / Inline Code 样式 (缺少时自动创建)",
+            **Theme.get_checkbox_style(),
+        )
+        self._checkbox_character_styles.on_change = self._handle_setting_change
+
         self._dropdown_style: ft.Dropdown = ft.Dropdown(
             width=180,
             options=[
@@ -145,6 +153,8 @@ class Toolbar:
                             self._checkbox_preserve_num,
                             ft.Container(width=8),
                             self._dropdown_style,
+                            ft.Container(width=8),
+                            self._checkbox_character_styles,
                         ],
                         alignment=ft.MainAxisAlignment.START,
                     ),
@@ -183,6 +193,11 @@ class Toolbar:
                 return self._dropdown_style.value
         return "none"
 
+    @property
+    def character_styles(self) -> bool:
+        """Get character styles setting"""
+        return self._checkbox_character_styles.value or False
+
     @property
     def preserve_numbered_lists(self) -> bool:
         """Get preserve numbered lists setting"""
@@ -193,11 +208,12 @@ class Toolbar:
         """Get numbered list style setting"""
         return self._dropdown_style.value or "转为纯文本 (1.)"
 
-    def set_template_name(self, name: str) -> None:
+    def set_template_name(self, name: str, missing_styles: list[str] | None = None) -> None:
         """Update template display name
 
         Args:
             name: Template name to display
+            missing_styles: Styles the template lacks (rendered with fallbacks), shown as a warning
         """
         if name:
             display_text = f"模板: {Path(name).name}"
@@ -206,13 +222,21 @@ class Toolbar:
             display_text = "模板: 默认"
             color = Theme.TEXT_SECONDARY
 
-        self._template_display.content = ft.Row(
-            [
-                ft.Icon(ft.Icons.DESCRIPTION, size=18, color=color),
-                ft.Text(display_text, size=13, color=color),
-            ],
-            spacing=8,
-        )
+        controls = [
+            ft.Icon(ft.Icons.DESCRIPTION, size=18, color=color),
+            ft.Text(display_text, size=13, color=color),
+        ]
+        if missing_styles:
+            controls.append(
+                ft.Icon(
+                    ft.Icons.WARNING_AMBER,
+                    size=16,
+                    color=Theme.WARNING,
+                    tooltip="模板缺少样式 (将使用回退方案): " + ", ".join(missing_styles),
+                )
+            )
+
+        self._template_display.content = ft.Row(controls, spacing=8)
         self._template_display.update()
 
     @property
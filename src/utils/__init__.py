@@ -1,7 +1,14 @@
 """Utility modules"""
 
-from .file_picker import FilePickerHandler
 from .platform import PlatformUtils
 from .get_path import get_download_path, get_resource_path
 
 __all__ = ["FilePickerHandler", "PlatformUtils", "get_download_path", "get_resource_path"]
+
+
+def __getattr__(name: str):
+    # FilePickerHandler 依赖 flet，按需导入，命令行模式无需加载 GUI
+    if name == "FilePickerHandler":
+        from .file_picker import FilePickerHandler
+        return FilePickerHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,101 @@
+"""Startup time measurement
+
+``python main.py --startup-timing [file.md]`` 启动桌面应用并在标准错误输出各启动阶段
+相对进程启动 (main.py 开始执行) 的耗时，用于跟踪冷启动性能回退::
+
+    ⏱️  window: 412.3 ms
+    ⏱️  parser_ready: 530.8 ms
+    ⏱️  first_preview: 705.1 ms
+    STARTUP_TIMING {"window": 412.3, "parser_ready": 530.8, "first_preview": 705.1}
+
+测量模式下会把指定文件 (或内置示例) 填入输入框以触发第一次预览。
+"""
+
+import json
+import sys
+import threading
+import time
+
+STARTUP_TIMING_FLAG = "--startup-timing"
+
+# 阶段名
+WINDOW = "window"
+PARSER_READY = "parser_ready"
+FIRST_PREVIEW = "first_preview"
+
+# 全部记录后输出汇总行
+_REPORT_AFTER = (WINDOW, FIRST_PREVIEW)
+
+_SAMPLE_TEXT = """# PureDoc
+
+Startup **timing** sample with *emphasis* and `code`.
+
+1. first
+2. second
+
+- item
+
+| a | b |
+|---|---|
+| 1 | 2 |
+"""
+
+
+class StartupTimer:
+    """Records the first occurrence of each startup milestone"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.enabled = False
+        self.sample_text: str | None = None
+        self.marks: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def start(self, origin: float, sample_path: str | None = None) -> None:
+        """Enable measurement
+
+        Args:
+            origin: perf_counter() value taken when main.py started
+            sample_path: Markdown file loaded to trigger the first preview, or None for a built-in sample
+        """
+        self.origin = origin
+        self.enabled = True
+        if sample_path:
+            with open(sample_path, "r", encoding="utf-8") as f:
+                self.sample_text = f.read()
+        else:
+            self.sample_text = _SAMPLE_TEXT
+
+    def mark(self, name: str) -> None:
+        """Record a milestone (only its first occurrence counts)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if name in self.marks:
+                return
+            elapsed = (time.perf_counter() - self.origin) * 1000
+            self.marks[name] = round(elapsed, 1)
+            report = not self._reported and all(m in self.marks for m in _REPORT_AFTER)
+            self._reported = self._reported or report
+            marks = dict(self.marks)
+        print(f"⏱️  {name}: {elapsed:.1f} ms", file=sys.stderr, flush=True)
+        if report:
+            print(f"STARTUP_TIMING {json.dumps(marks)}", file=sys.stderr, flush=True)
+
+
+def parse_startup_args(argv: list[str]) -> tuple[bool, str | None]:
+    """Detect ``--startup-timing [file.md]`` in the desktop app arguments
+
+    Returns:
+        Tuple of (enabled, sample file path or None)
+    """
+    if STARTUP_TIMING_FLAG not in argv:
+        return False, None
+    index = argv.index(STARTUP_TIMING_FLAG)
+    sample = argv[index + 1] if index + 1 < len(argv) and not argv[index + 1].startswith("-") else None
+    return True, sample
+
+
+# 进程内共享的计时器
+startup_timer = StartupTimer()
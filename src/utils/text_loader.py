@@ -0,0 +1,125 @@
+"""Chunked text file loading with encoding detection
+
+导入的 Markdown 文件不一定是 UTF-8 (中文环境中常见 GBK/GB18030)。编码只根据文件开头
+的一小段样本判断，然后按块增量解码并报告进度，供界面在后台线程中调用。
+"""
+
+import codecs
+import os
+import threading
+from typing import IO, Callable
+
+# 用于判断编码的样本大小
+SAMPLE_BYTES = 64 << 10
+# 每次读取的块大小
+CHUNK_BYTES = 1 << 20
+
+# 按顺序尝试的编码；latin-1 可以解码任意字节，作为最后的回退
+FALLBACK_ENCODINGS = ("utf-8", "gb18030", "latin-1")
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class LoadCancelled(Exception):
+    """Raised when a load is cancelled through its cancel event"""
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Guess the encoding of a file from its first bytes
+
+    Args:
+        sample: Leading bytes of the file (may end in the middle of a character)
+
+    Returns:
+        Codec name: the BOM's encoding, else the first of FALLBACK_ENCODINGS that decodes the sample
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            # final=False: 样本末尾被截断的多字节字符不算错误
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return FALLBACK_ENCODINGS[-1]
+
+
+def open_text(path: "str | os.PathLike") -> IO[str]:
+    """Open a text file for streaming reads, with the encoding detected from a prefix sample
+
+    Unlike read_text the encoding cannot be switched once reading has started, so a file
+    whose later part does not decode with the detected encoding raises UnicodeDecodeError.
+
+    Args:
+        path: File path
+
+    Returns:
+        Text file object (universal newlines)
+    """
+    with open(path, "rb") as f:
+        encoding = detect_encoding(f.read(SAMPLE_BYTES))
+    return open(path, "r", encoding=encoding)
+
+
+def read_text(
+    path: "str | os.PathLike",
+    progress: Callable[[int, int], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[str, str]:
+    """Read a text file in chunks, detecting its encoding from a prefix sample
+
+    If the detected encoding fails later in the file, decoding restarts with the
+    next fallback encoding. Line endings are normalized to "\\n" like open_text's
+    universal newlines, so a CRLF file gives the same text as its LF copy.
+
+    Args:
+        path: File path
+        progress: Called with (bytes read, total bytes) after each chunk
+        cancel: Event that aborts the read (raises LoadCancelled)
+
+    Returns:
+        Tuple of (text, encoding)
+    """
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        detected = detect_encoding(f.read(SAMPLE_BYTES))
+        candidates = list(dict.fromkeys((detected, *FALLBACK_ENCODINGS)))
+        for encoding in candidates[:-1]:
+            f.seek(0)
+            try:
+                return _decode_chunks(f, encoding, total, progress, cancel), encoding
+            except UnicodeDecodeError:
+                continue
+        f.seek(0)
+        return _decode_chunks(f, candidates[-1], total, progress, cancel), candidates[-1]
+
+
+def _decode_chunks(f, encoding: str, total: int, progress, cancel) -> str:
+    """Incrementally decode a binary file from its current position"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = []
+    done = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise LoadCancelled()
+        chunk = f.read(CHUNK_BYTES)
+        if not chunk:
+            break
+        parts.append(decoder.decode(chunk))
+        done += len(chunk)
+        if progress is not None:
+            progress(done, total)
+    parts.append(decoder.decode(b"", final=True))
+    text = "".join(parts)
+    # 在拼接后统一换行符，块边界上被拆开的 "\r\n" 也只算一个换行
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
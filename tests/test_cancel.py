@@ -0,0 +1,53 @@
+"""Cancelling a Word conversion"""
+
+import threading
+
+import pytest
+
+from benchmarks.corpus import generate
+from src.core import parallel_parse, pure_converter
+from src.core.pure_converter import ConversionCancelled, PureConverter
+
+
+@pytest.mark.parametrize("engine", ["docx", "ooxml"])
+def test_cancel_during_parse(tmp_path, monkeypatch, engine):
+    monkeypatch.setattr(pure_converter, "CANCELLABLE_PARSE_CHUNK", 2000)
+    md_text = generate(40000, 1)
+    cancel = threading.Event()
+    parsed = []
+    parse_chunk = parallel_parse._parse_chunk
+
+    def parse_and_cancel(chunk, references=None):
+        # 解析第一段时用户点击了取消
+        parsed.append(chunk)
+        cancel.set()
+        return parse_chunk(chunk, references)
+
+    monkeypatch.setattr(parallel_parse, "_parse_chunk", parse_and_cancel)
+    converter = PureConverter()
+    output = tmp_path / "out.docx"
+    with pytest.raises(ConversionCancelled):
+        converter.convert_to_word(md_text, str(output), {}, engine=engine, cancel=cancel)
+    assert len(parsed) == 1
+    assert not output.exists()
+    # 被取消的解析结果不进入缓存
+    assert md_text not in converter._models
+
+
+def test_cancel_before_start(tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    output = tmp_path / "out.docx"
+    with pytest.raises(ConversionCancelled):
+        PureConverter().convert_to_word("# A\n", str(output), {}, cancel=cancel)
+    assert not output.exists()
+
+
+def test_cancellable_parse_matches_full_parse(monkeypatch):
+    monkeypatch.setattr(pure_converter, "CANCELLABLE_PARSE_CHUNK", 2000)
+    md_text = generate(40000, 2)
+    converter = PureConverter(parse_cache_size=0)
+    chunked = converter.convert_text(md_text, {})
+    model = converter.parse(md_text, cancel=threading.Event())
+    assert converter.convert_text(md_text, {}) == chunked
+    assert len(model.blocks) == len(converter.parse(md_text).blocks)
@@ -0,0 +1,74 @@
+"""Chunked parsing must produce the same document as parsing the whole text"""
+
+import random
+
+import pytest
+
+from src.core.parallel_parse import create_parser, parse_parallel, split_chunks
+from src.core.document_model import build_blocks
+from tests.utils import dump_blocks
+
+PIECES = [
+    "", "", "# Head", "para text", "**bold** *it*", "---", "***", "===", "> quote", "    indented",
+    "- item", "  - nested", "  - item", "1. one", "2. two",
+    "```", "~~~", "  ```", "```a`b", "code",
+    "<div>", "</div>", "\t<div>", "    <div>", "<div>x</div>", "<span>", "</span>", "<foo", "text <b>",
+    "<pre>", "</pre>", "<pre>x</pre>", "<!--", "-->", "<!-->", "<script>", "</script>", "<table>", "<?php", "?>",
+    "| a | b |", "|---|---|", "| 1 | 2 |", "[x]", "[x]: http://e.com",
+    "> ```", "> ~~~", ">", "> - item", "> <pre>", "> <div>", "> > q", "<textarea>", "</textarea>",
+    "<style>", "</style>", "   ```", "    ", "  ", "- ```", "1) x", "* * *", "Setext",
+]
+
+
+def full_parse(md_text):
+    return dump_blocks(build_blocks(create_parser().parse(md_text)))
+
+
+def chunked_parse(md_text):
+    model, _ = parse_parallel(md_text, workers=1, chunk_size=1)
+    return dump_blocks(model.blocks)
+
+
+@pytest.mark.parametrize("md_text", [
+    # 围栏
+    "```\ncode\n\n# not a heading\n```\n\npara\n",
+    "~~~\n```\n\n~~~\n\npara\n",
+    # HTML 块 (类型 6/7 在空行结束，块内不识别围栏和 <pre>)
+    "<div>\n```\n\n```\n\n~~~\n",
+    "</div>\n<pre>\n\n~~~\n</pre>\n\n-->\n",
+    "<pre>\n\n# in pre\n</pre>\n\npara\n",
+    "<!--\n\n```\n-->\n\npara\n",
+    "text <b>\n<span>\n\n```\n\n```\n",
+    # 列表
+    "- item\n  ```\n```\n\n\n<div>\n~~~\n",
+    "- item\n\n  ```\n\ncode\n```\n\npara\n",
+    "1. one\npara text\n- item\n===\n<span>\n- item\n```\n[x]\n<pre>x</pre>\n\n| 1 | 2 |\n",
+    # 引用块 (块内的围栏、惰性续行不会变成 setext 标题)
+    "> ```\nx\n```\n\ny\n",
+    ">\n===\n</pre>\n  ```\n\n</div>\n",
+    "> <pre>\n===\n</span>\n<!--\n\n===\nSetext",
+    "> quote\n> ~~~\n===\n</style>\n</textarea>\n  ```\n    \n<div>\n-->\n</pre>\n~~~\n",
+    # 末尾没有换行、最后一行只含空白
+    "x\n\n```\ncode\n    ",
+    "x\n\n<pre>\n\n  ",
+])
+def test_chunked_matches_full_parse(md_text):
+    assert chunked_parse(md_text) == full_parse(md_text)
+
+
+def test_chunked_matches_full_parse_random():
+    rng = random.Random(0)
+    for _ in range(3000):
+        md_text = "\n".join(rng.choice(PIECES) for _ in range(rng.randint(1, 20))) + rng.choice(["\n", ""])
+        assert chunked_parse(md_text) == full_parse(md_text), md_text
+
+
+def test_references_resolved_across_chunks():
+    md_text = "[x]\n\n" + "para\n\n" * 3 + "[x]: http://e.com\n"
+    assert len(split_chunks(md_text, 1)) > 1
+    assert chunked_parse(md_text) == full_parse(md_text)
+
+
+@pytest.mark.parametrize("md_text", ["# A\n\npara\n\n```\n\n```\n\n- a\n\n- b\n", "# A\n\npara\n\n  ", ""])
+def test_chunks_cover_text(md_text):
+    assert "".join(split_chunks(md_text, 1)) == md_text
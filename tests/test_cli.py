@@ -0,0 +1,39 @@
+"""Batch conversion input collection and output planning"""
+
+from pathlib import Path
+
+from src.cli import _format_stats, collect_inputs, plan_outputs
+from src.core.pure_converter import PureConverter
+from src.core.stats import ConversionStats
+
+
+def test_colliding_outputs_get_distinct_names(tmp_path, capsys):
+    (tmp_path / "x").mkdir()
+    (tmp_path / "y").mkdir()
+    for name in ("x/a.md", "x/a.markdown", "y/a.md"):
+        (tmp_path / name).write_text("# A\n", encoding="utf-8")
+    inputs = [str(tmp_path / "x"), str(tmp_path / "y" / "a.md"), str(tmp_path / "x" / "a.md")]
+
+    targets = plan_outputs(collect_inputs(inputs), Path("out"))
+
+    assert list(targets.values()) == [str(Path("out/a.docx")), str(Path("out/a-2.docx")), str(Path("out/a-3.docx"))]
+    # 同一个源文件只转换一次
+    assert len(targets) == 3
+    assert "输出路径相同" in capsys.readouterr().err
+
+
+def test_numbered_name_skips_existing_targets(tmp_path):
+    pairs = [(Path("p/a.md"), Path("a.md")), (Path("p/a-2.md"), Path("a-2.md")), (Path("q/a.md"), Path("a.md"))]
+    targets = plan_outputs(pairs, Path("out"))
+    assert len(set(targets.values())) == 3
+    assert targets[str(Path("q/a.md"))] == str(Path("out/a-3.docx"))
+
+
+def test_stats_count_blocks():
+    md_text = "# T\n\npara\n\n- a\n- b\n\n```\ncode\n```\n"
+    converter = PureConverter()
+    stats = ConversionStats()
+    model = converter.parse(md_text, stats)
+    assert stats.counters["blocks"] == len(model.blocks) == 5
+    assert "paragraphs" not in stats.counters
+    assert f"blocks {len(model.blocks)}" in _format_stats(stats.as_dict())
@@ -0,0 +1,37 @@
+"""Image header probing"""
+
+import base64
+
+import pytest
+
+from src.core.images import load_image, probe_image
+from src.core.pure_converter import PureConverter
+
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+GIF = b"GIF89a\x02\x00\x03\x00\x00\x00\x00;"
+JPEG = b"\xff\xd8\xff\xe0\x00\x04\x00\x00\xff\xc0\x00\x0b\x08\x00\x05\x00\x06\x01\x01\x11\x00\xff\xd9"
+
+
+def test_probe_valid():
+    assert probe_image(PNG) == ("png", 1, 1)
+    assert probe_image(GIF) == ("gif", 2, 3)
+    assert probe_image(JPEG) == ("jpeg", 6, 5)
+
+
+@pytest.mark.parametrize("data", [
+    PNG[:16], PNG[:20], PNG[:23],
+    GIF[:6], GIF[:9],
+    JPEG[:3], JPEG[:5], JPEG[:9], JPEG[:12], JPEG[:16],
+])
+def test_probe_truncated(data):
+    assert probe_image(data) is None
+
+
+@pytest.mark.parametrize("engine", ["docx", "ooxml"])
+def test_truncated_data_uri_is_skipped(engine):
+    src = "data:image/png;base64," + base64.b64encode(PNG[:16]).decode()
+    assert load_image(src) is None
+    data = PureConverter().convert_to_bytes(f"![x]({src})\n\ntext\n", {}, engine=engine)
+    assert data[:2] == b"PK"
@@ -0,0 +1,97 @@
+"""Incremental preview must match a full conversion after any sequence of edits"""
+
+import random
+
+import pytest
+
+from src.core.incremental_preview import IncrementalPreview
+from src.core.pure_converter import PureConverter
+from tests.utils import dump_blocks
+
+LINES = [
+    "", "", "# Head", "para text", "**bold** *it*", "Setext", "===", "---", "> quote", "    indented",
+    "- item", "  - nested", "1. one", "2. two", "| a | b |", "|---|---|", "| 1 | 2 |",
+    "```", "```", "~~~", "code", "    ", "  ", "\t",
+    "<div>", "</div>", "<span>", "<pre>", "</pre>", "<!--", "-->",
+]
+SETTINGS = {"ignore_bullets": False, "ordered_list_style": "text"}
+
+
+def edit(rng, text):
+    """Insert, delete or change one line"""
+    lines = text.split("\n")
+    i = rng.randrange(len(lines) + 1)
+    op = rng.random()
+    if op < 0.4:
+        lines.insert(i, rng.choice(LINES))
+    elif op < 0.7 and len(lines) > 1:
+        del lines[min(i, len(lines) - 1)]
+    else:
+        j = min(i, len(lines) - 1)
+        k = rng.randrange(len(lines[j]) + 1)
+        lines[j] = lines[j][:k] + rng.choice(["x", " ", "`", "#", "- ", "<", "\n", ""]) + lines[j][k:]
+    return "\n".join(lines)
+
+
+def random_edits(seed, steps, size):
+    rng = random.Random(seed)
+    text = "\n".join(rng.choice(LINES) for _ in range(size))
+    for _ in range(steps):
+        text = edit(rng, text)
+        yield text
+
+
+@pytest.mark.parametrize("text", [
+    # 未闭合的代码块后面是只含空白的最后一行
+    "x\n\n```\ncode\n    ",
+    "```\n  \n  ",
+    "<pre>\n\n  ",
+    "<div>\n```\n\n  ",
+])
+def test_unclosed_block_at_end(text):
+    converter = PureConverter(parse_cache_size=0)
+    preview = IncrementalPreview(converter)
+    preview.update("x")
+    assert preview.update(text, SETTINGS) == converter.convert_text(text, SETTINGS)
+    assert preview.update(text + "x", SETTINGS) == converter.convert_text(text + "x", SETTINGS)
+    assert preview.update(text, SETTINGS) == converter.convert_text(text, SETTINGS)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_update_matches_convert_text(seed):
+    converter = PureConverter(parse_cache_size=0)
+    preview = IncrementalPreview(converter)
+    for text in random_edits(seed, 400, 12):
+        assert preview.update(text, SETTINGS) == converter.convert_text(text, SETTINGS), text
+    assert preview.partial_parses > 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_cached_model_matches_parse(seed):
+    converter = PureConverter()
+    reference = PureConverter(parse_cache_size=0)
+    preview = IncrementalPreview(converter)
+    for text in random_edits(seed, 400, 12):
+        preview.update(text, SETTINGS)
+        # update() 登记了拼接出的文档模型，parse 直接返回它
+        assert dump_blocks(converter.parse(text).blocks) == dump_blocks(reference.parse(text).blocks), text
+
+
+def test_unclosed_fence_parses_rest_once():
+    converter = PureConverter(parse_cache_size=0)
+    preview = IncrementalPreview(converter)
+    text = "\n\n".join(f"para {i}" for i in range(2000))
+    preview.update(text, SETTINGS)
+    expected = converter.convert_text("```\n" + text, SETTINGS)
+
+    calls = []
+    parse = converter.md.parse
+    converter.md.parse = lambda src, env=None: calls.append(src) or parse(src, env)
+    try:
+        # 在开头打开一个不闭合的代码块，之后所有块都变成代码
+        assert preview.update("```\n" + text, SETTINGS) == expected
+    finally:
+        del converter.md.parse
+    assert preview.partial_parses == 1
+    assert len(calls) <= 3
+    assert sum(len(src) for src in calls) < 3 * len(text)
@@ -0,0 +1,91 @@
+"""Conversion result cache"""
+
+import base64
+import os
+import time
+
+import pytest
+
+from src.core.pure_converter import PureConverter
+from src.core.result_cache import STALE_TEMP_SECONDS, ResultCache
+
+# 1x1 PNG
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def test_cache_hit_for_same_input(tmp_path):
+    converter = PureConverter()
+    cache = ResultCache(tmp_path / "cache")
+    first = converter.convert_cached("# A\n", {}, cache)
+    assert converter.convert_cached("# A\n", {}, cache) == first
+    assert converter.convert_cached("# B\n", {}, cache) != first
+
+
+def test_replacing_local_image_invalidates(tmp_path):
+    image = tmp_path / "a.png"
+    image.write_bytes(PNG)
+    settings = {"image_base_dir": str(tmp_path)}
+    converter = PureConverter()
+    cache = ResultCache(tmp_path / "cache")
+
+    first = converter.convert_cached("![x](a.png)\n", settings, cache)
+    assert converter.convert_cached("![x](a.png)\n", settings, cache) == first
+
+    image.write_bytes(PNG + b"\0")
+    second = converter.convert_cached("![x](a.png)\n", settings, cache)
+    assert second != first
+
+    # 大小相同、只改修改时间也算变化
+    st = image.stat()
+    os.utime(image, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert converter.convert_cached("![x](a.png)\n", settings, cache) != second
+
+
+def test_missing_image_then_created(tmp_path):
+    settings = {"image_base_dir": str(tmp_path)}
+    converter = PureConverter()
+    cache = ResultCache(tmp_path / "cache")
+    first = converter.convert_cached("![x](a.png)\n", settings, cache)
+    (tmp_path / "a.png").write_bytes(PNG)
+    assert converter.convert_cached("![x](a.png)\n", settings, cache) != first
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    cache = ResultCache(tmp_path)
+
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise RuntimeError("conversion failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_create("k" * 64, write)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_temp_files_are_evicted(tmp_path):
+    stale = tmp_path / ".old-1.docx"
+    fresh = tmp_path / ".new-1.docx"
+    for path in (stale, fresh):
+        path.write_bytes(b"x")
+    old = time.time() - STALE_TEMP_SECONDS - 60
+    os.utime(stale, (old, old))
+
+    ResultCache(tmp_path).get_or_create("k" * 64, lambda path: open(path, "wb").close())
+    assert not stale.exists()
+    # 可能仍在写入的临时文件保留
+    assert fresh.exists()
+
+
+def test_evict_survives_concurrent_removal(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path, max_bytes=1)
+    cache.get_or_create("a" * 64, lambda path: open(path, "wb").write(b"aa"))
+
+    def samefile(a, b):
+        raise FileNotFoundError(a)
+
+    monkeypatch.setattr(os.path, "samefile", samefile)
+    path = cache.get_or_create("b" * 64, lambda path: open(path, "wb").write(b"bb"))
+    assert path.exists()
@@ -0,0 +1,111 @@
+"""Request parsing of the HTTP conversion service"""
+
+import asyncio
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.server import ConversionServer, HTTPError, _parse_convert_request
+from src.core.images import read_image_source
+
+
+def handle(raw: bytes) -> bytes:
+    """Feed one raw request to ConversionServer._handle_request and return the response"""
+
+    class Writer:
+        def __init__(self):
+            self.data = b""
+
+        def write(self, data):
+            self.data += data
+
+        async def drain(self):
+            pass
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        writer = Writer()
+        request_line = await reader.readline()
+        await ConversionServer({"default": None})._handle_request(request_line, reader, writer)
+        return writer.data
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-1", b"+5", b"1_0", b"\xb2"])
+def test_invalid_content_length(length):
+    response = handle(b"GET /health HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 400 ")
+
+
+def test_content_length_too_large():
+    response = handle(b"POST /convert HTTP/1.1\r\nContent-Length: 99999999999\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 413 ")
+
+
+def test_valid_content_length():
+    response = handle(b"GET /health HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert response.startswith(b"HTTP/1.1 200 ")
+
+
+def test_settings_whitelist():
+    body = json.dumps({
+        "markdown": "# A",
+        "settings": {"code_highlight": False, "image_base_dir": "/etc", "local_images": True, "other": 1},
+    }).encode()
+    _, settings, _, _ = _parse_convert_request({"content-type": "application/json"}, body)
+    assert settings == {"code_highlight": False, "local_images": False}
+
+
+def test_plain_body_disables_local_images():
+    md_text, settings, _, _ = _parse_convert_request({}, b"# A")
+    assert md_text == "# A"
+    assert settings == {"local_images": False}
+
+
+def test_settings_must_be_object():
+    with pytest.raises(HTTPError) as e:
+        _parse_convert_request({"content-type": "application/json"}, b'{"markdown": "", "settings": [1]}')
+    assert e.value.status == 400
+
+
+@pytest.mark.parametrize("field", ["template", "engine"])
+@pytest.mark.parametrize("value", [1, ["default"], {"id": "default"}])
+def test_non_string_template_and_engine(field, value):
+    body = json.dumps({"markdown": "# A", field: value}).encode()
+    with pytest.raises(HTTPError) as e:
+        _parse_convert_request({"content-type": "application/json"}, body)
+    assert e.value.status == 400
+
+
+def test_broken_pool_is_replaced():
+    async def run():
+        server = ConversionServer({"default": None}, workers=1)
+        server._slots = asyncio.Semaphore(1)
+        server._pool = broken = server._new_pool()
+        try:
+            # 模拟工作进程崩溃
+            with pytest.raises(BrokenProcessPool):
+                await asyncio.get_running_loop().run_in_executor(broken, os._exit, 1)
+            with pytest.raises(HTTPError) as e:
+                await server.convert("# A", {}, None, "docx")
+            assert e.value.status == 503
+            assert server._pool is not broken
+            data = await server.convert("# A", {}, None, "ooxml")
+            assert data[:2] == b"PK"
+        finally:
+            server._pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_local_files_disabled(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"data")
+    assert read_image_source(str(path)) == b"data"
+    assert read_image_source(str(path), local_files=False) is None
+    assert read_image_source("data:,abc", local_files=False) == b"abc"
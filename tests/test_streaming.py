@@ -0,0 +1,92 @@
+"""Streaming export must produce the same package as converting the whole text in memory"""
+
+import io
+import zipfile
+
+import pytest
+
+from benchmarks.corpus import generate
+from src.core.pure_converter import PureConverter
+
+TEMPLATE = "assets/template/template.docx"
+
+# HTML 块和代码块密集的样本：块内的空行、围栏和 <pre> 不能成为切分点
+HTML_FENCE_SAMPLE = """\
+# HTML
+
+<div>
+```
+
+```
+
+~~~
+</div>
+
+</div>
+<pre>
+
+~~~
+</pre>
+
+-->
+
+<!--
+
+```
+-->
+
+para text <b>
+<span>
+
+```
+
+```
+
+- item
+  ```
+```
+
+code
+
+```
+
+<table>
+<tr><td>
+
+# not a heading
+
+</td></tr>
+</table>
+
+~~~python
+<div>
+
+</div>
+~~~
+"""
+
+
+def parts(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+@pytest.fixture(scope="module")
+def converter():
+    return PureConverter(template_path=TEMPLATE, parse_cache_size=0)
+
+
+@pytest.mark.parametrize("engine", ["docx", "ooxml"])
+@pytest.mark.parametrize("md_text", [
+    generate(20 << 10, 1),
+    generate(20 << 10, 2),
+    HTML_FENCE_SAMPLE * 3,
+    # 末尾没有换行，最后一行只含空白 (未闭合的代码块中不应多出一行)
+    generate(20 << 10, 3) + "\n\n```\ncode\n    ",
+    HTML_FENCE_SAMPLE + "\n<pre>\n\n  ",
+], ids=["corpus-1", "corpus-2", "html-fence", "no-newline-fence", "no-newline-html"])
+def test_streamed_matches_in_memory(converter, md_text, engine):
+    expected = converter.convert_to_bytes(md_text, {}, engine=engine)
+    out = io.BytesIO()
+    converter.convert_stream_to_word(io.StringIO(md_text), out, {}, chunk_size=256, engine=engine)
+    assert parts(out.getvalue()) == parts(expected)
@@ -0,0 +1,108 @@
+"""Template cache: hits, invalidation, copy isolation and header parts"""
+
+import base64
+import io
+import os
+import zipfile
+
+import pytest
+from docx import Document
+
+from src.core.template_cache import TemplateCache, save_document
+
+TEMPLATE = "assets/template/template.docx"
+
+# 1x1 PNG
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+@pytest.fixture
+def template(tmp_path):
+    """A template with body content and an image in the page header"""
+    doc = Document(TEMPLATE)
+    doc.add_paragraph("template body")
+    doc.sections[0].header.paragraphs[0].add_run().add_picture(io.BytesIO(PNG))
+    path = tmp_path / "template.docx"
+    doc.save(path)
+    return str(path)
+
+
+def saved_parts(doc) -> dict[str, bytes]:
+    out = io.BytesIO()
+    save_document(doc, out)
+    with zipfile.ZipFile(out) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def test_hit_and_miss(template):
+    cache = TemplateCache()
+    cache.get(template)
+    cache.get(template)
+    cache.get_styles(template)
+    assert cache.stats == {"hits": 2, "misses": 1, "entries": 1}
+    cache.get(None)
+    assert cache.stats["misses"] == 2
+    assert cache.stats["entries"] == 2
+
+
+def test_invalidated_by_mtime(template):
+    cache = TemplateCache()
+    cache.get(template)
+    st = os.stat(template)
+    os.utime(template, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    cache.get(template)
+    assert cache.stats["misses"] == 2
+
+
+def test_invalidated_by_size(template):
+    cache = TemplateCache()
+    cache.get(template)
+    st = os.stat(template)
+    doc = Document(template)
+    doc.add_paragraph("more")
+    doc.save(template)
+    # 只有大小变化，修改时间不变
+    os.utime(template, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(template).st_size != st.st_size
+    cache.get(template)
+    assert cache.stats["misses"] == 2
+
+
+def test_body_is_stripped(template):
+    doc = TemplateCache().get(template)
+    assert not doc.paragraphs
+    assert not doc.tables
+
+
+def test_copies_are_isolated(template):
+    cache = TemplateCache()
+    first = cache.get(template)
+    first.add_paragraph("changed")
+    first.sections[0].header.paragraphs[0].add_run("header text")
+    first.styles["Normal"].font.bold = True
+
+    second = cache.get(template)
+    assert not second.paragraphs
+    assert "header text" not in second.sections[0].header.paragraphs[0].text
+    assert second.styles["Normal"].font.bold is None
+    assert cache.get_styles(template) is cache.get_styles(template)
+
+
+def test_header_image_preserved(template):
+    parts = saved_parts(TemplateCache().get(template))
+    media = [name for name in parts if name.startswith("word/media/")]
+    assert len(media) == 1
+    assert parts[media[0]] == PNG
+    headers = [name for name in parts if name.startswith("word/header")]
+    assert headers and b"<a:blip" in parts[headers[0]]
+    rels = parts[f"word/_rels/{headers[0][len('word/'):]}.rels"]
+    assert media[0][len("word/"):].encode() in rels
+
+
+def test_package_keeps_header_image(template):
+    package = TemplateCache().get_package(template)
+    names = [name for name, _ in package.parts]
+    assert any(name.startswith("word/media/") for name in names)
+    assert any(name.startswith("word/header") for name in names)
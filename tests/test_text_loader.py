@@ -0,0 +1,20 @@
+"""Text file loading"""
+
+import pytest
+
+from src.utils import text_loader
+from src.utils.text_loader import read_text
+
+TEXT = "# 标题\n\n第一段\n第二行\n\n- a\n- b\n"
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\r"])
+@pytest.mark.parametrize("encoding", ["utf-8", "gb18030"])
+def test_line_endings_normalized(tmp_path, monkeypatch, newline, encoding):
+    # 小块读取，让 "\r\n" 落在块边界上
+    monkeypatch.setattr(text_loader, "CHUNK_BYTES", 3)
+    lf = tmp_path / "lf.md"
+    lf.write_bytes(TEXT.encode(encoding))
+    other = tmp_path / "other.md"
+    other.write_bytes(TEXT.replace("\n", newline).encode(encoding))
+    assert read_text(other) == read_text(lf) == (TEXT, encoding)
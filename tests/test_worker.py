@@ -0,0 +1,29 @@
+"""Batch conversion reads files in any supported encoding"""
+
+import zipfile
+
+import pytest
+
+from src.core import worker
+from src.core.streaming import iter_lines
+
+TEXT = "# 标题\n\n中文段落\n"
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "gb18030", "utf-16"])
+def test_convert_file_detects_encoding(tmp_path, encoding):
+    src = tmp_path / "in.md"
+    src.write_bytes(TEXT.encode(encoding))
+    dst = tmp_path / "out" / "in.docx"
+    _, error, _, _ = worker.convert_file(str(src), str(dst), {})
+    assert error is None
+    with zipfile.ZipFile(dst) as z:
+        xml = z.read("word/document.xml").decode("utf-8")
+    assert "中文段落" in xml
+
+
+@pytest.mark.parametrize("encoding", ["utf-8-sig", "gb18030", "utf-16"])
+def test_iter_lines_detects_encoding(tmp_path, encoding):
+    src = tmp_path / "in.md"
+    src.write_bytes(TEXT.encode(encoding))
+    assert list(iter_lines(str(src))) == TEXT.split("\n")
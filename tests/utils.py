@@ -0,0 +1,17 @@
+"""Helpers shared by the tests"""
+
+
+def dump_runs(runs):
+    return [(type(run).__name__, run.text, run.flags, getattr(run, "alt", None)) for run in runs or ()]
+
+
+def dump_blocks(blocks):
+    """Comparable snapshot of document model blocks (Block defines no __eq__)"""
+    return [
+        (
+            b.kind, b.level, b.list_type, b.ordinal, b.source, b.raw_runs, b.align, b.lang,
+            dump_runs(b.runs),
+            [[(cell.source, dump_runs(cell.runs)) for cell in row] for row in b.rows or ()],
+        )
+        for b in blocks
+    ]